@@ -1,36 +1,103 @@
 import os
 import json
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify
-import pandas as pd
-import numpy as np
+import time
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, Response, stream_with_context
 # Import logic modules from the src directory
 from src.ai_matcher import AIMatcher
-from src.ranking_engine import RankingEngine
 from src.llm_advisor import LLMAdvisor
+from src.data_cache import JsonFileCache
+from src.session_precompute import SessionPrecomputer, SESSION_PRECOMPUTE
+from src.advisor_jobs import AdvisorJobQueue
+
+# Serve-only workers score with the exported ranker params instead of loading
+# scikit-learn/pandas and training; training and rollback stay in a normal-mode
+# process. They still load the matcher (sentence-transformers) to embed queries,
+# which dominates their import cost (see benchmarks/serve_imports.py).
+RANKER_SERVE_ONLY = os.environ.get("RANKER_SERVE_ONLY", "0") == "1"
 
 app = Flask(__name__)
 # Use a secret key for session management (required for role persistence)
 app.secret_key = 'super_secret_mentoring_key'
 
+# --- Data Files ---
+# Parsed once and revalidated by mtime, instead of re-reading the JSON on every request
+STUDENTS = JsonFileCache(
+    os.path.join('src', 'data', 'students.json'),
+    transform=lambda data: {s['id']: s for s in data},
+    default={}
+)
+# Mentors file is the source of truth for index_mentors
+MENTORS = JsonFileCache(os.path.join('src', 'data', 'mentors.json'), default=[])
+
+# Helper to load student data
+def load_students():
+    return STUDENTS.get()
+
+# Helpers to load and persist mentor data
+def load_mentors():
+    return MENTORS.get()
+
+def save_mentors(mentors):
+    MENTORS.write(mentors)
+
 # --- Initialize Systems ---
 # Initialization is done once when the app starts
 try:
     MATCHER = AIMatcher()
     MATCHER.index_mentors()
-    RANKER = RankingEngine()
-    RANKER.train_ranker()
+    if RANKER_SERVE_ONLY:
+        from src.fast_scorer import ExportedRanker
+        RANKER = ExportedRanker()
+    else:
+        from src.ranking_engine import RankingEngine
+        RANKER = RankingEngine()
+        RANKER.load_or_train()
     ADVISOR = LLMAdvisor()
+    # Background match + plan precompute for /session_analysis. Off by default; when
+    # enabled it runs in the normal-mode (training) process only, not in every
+    # serve-only worker, since each pass makes one advisor call per changed plan.
+    PRECOMPUTE = SessionPrecomputer(MATCHER, RANKER, ADVISOR, STUDENTS)
+    if SESSION_PRECOMPUTE and not RANKER_SERVE_ONLY:
+        PRECOMPUTE.start()
 except Exception as e:
     print(f"Failed to initialize core components: {e}")
     # Exit or handle gracefully in a production environment
 
-# Helper to load student data
-def load_students():
-    path = os.path.join('src', 'data', 'students.json')
-    if os.path.exists(path):
-        with open(path, 'r') as f:
-            return {s['id']: s for s in json.load(f)}
-    return {}
+# Rows returned by the weight preview; the total is always reported
+PREVIEW_MAX_ROWS = 200
+
+# Bounded pool for advisor (LLM) calls submitted through /advisor/jobs
+ADVISOR_JOBS = AdvisorJobQueue()
+
+def current_weights():
+    return {
+        'vector_distance': session.get('vector_distance_weight', 1.0),
+        'historical_success': session.get('historical_success_weight', 1.0)
+    }
+
+def analyze_student(student, weights):
+    """Best mentor + study plan for one student. Returns None if nothing matched."""
+    # 1. Stored matches + plan from the background pipeline (computed now on a cold miss)
+    entry, is_fresh = PRECOMPUTE.get(student)
+    if entry is None:
+        entry, is_fresh = PRECOMPUTE.compute(student), True
+    if not entry['matches']:
+        return None
+
+    # 2. Re-rank the stored candidates with the current ranker and admin weights
+    final_match = RANKER.score_matches(
+        entry['matches'],
+        distance_weight=weights['vector_distance'],
+        success_weight=weights['historical_success']
+    )[0]
+
+    # 3. AI Plan (precomputed unless these weights pick a different mentor)
+    return {
+        'match': final_match,
+        'plan_html': PRECOMPUTE.plan_for(student, final_match),
+        'computed_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['computed_at'])),
+        'is_fresh': is_fresh
+    }
 
 # --- ROUTES ---
 
@@ -39,13 +106,8 @@ def index():
     """Renders the main dashboard (Admin view)."""
 
     # --- Data for Dashboard ---
-    mentors_path = os.path.join('src', 'data', 'mentors.json')
     students = load_students()
-
-    mentor_count = 0
-    if os.path.exists(mentors_path):
-        with open(mentors_path, 'r') as f:
-            mentor_count = len(json.load(f))
+    mentor_count = len(load_mentors())
 
     # --- Role and Weights for display/forms ---
     role = session.get('role', 'Admin')
@@ -68,8 +130,10 @@ def index():
         role=role,
         mentor_count=mentor_count,
         student_count=len(students),
-        feedback_count=len(RANKER.feedback_data),
-        weights=weights
+        feedback_count=RANKER.feedback_count,
+        weights=weights,
+        model_versions=RANKER.registry.history(),
+        retrain_status=RANKER.retrain_status
     )
 
 @app.route('/set_role', methods=['POST'])
@@ -88,61 +152,97 @@ def update_weights():
         pass # Handle error gracefully
     return redirect(url_for('index'))
 
+@app.route('/admin/weights/preview')
+def preview_weights():
+    """What-if: how each student's top mentor would change under the given slider weights."""
+    current = current_weights()
+    try:
+        proposed = (
+            float(request.args.get('vector_distance', current['vector_distance'])),
+            float(request.args.get('historical_success', current['historical_success']))
+        )
+    except ValueError:
+        return jsonify({'error': 'weights must be numbers'}), 400
+
+    preview = PRECOMPUTE.preview_weights((current['vector_distance'], current['historical_success']), proposed)
+    preview['changed'] = preview['changed'][:PREVIEW_MAX_ROWS]
+    return jsonify(preview)
+
 @app.route('/retrain', methods=['POST'])
 def retrain_model():
-    """Handles manual model retraining."""
-    if RANKER.train_ranker():
-        # You'd typically log success here
+    """Starts model retraining in the background; serving continues on the current model."""
+    # Unchecked box keeps the RANKER_MODEL_SELECTION default
+    model_selection = True if request.form.get('model_selection') else None
+    if not RANKER.retrain_async(model_selection=model_selection):
+        print("Retrain already running; request ignored.")
+    return redirect(url_for('index'))
+
+@app.route('/rollback_model', methods=['POST'])
+def rollback_model():
+    """Re-activates an earlier ranker version."""
+    try:
+        if RANKER.rollback(int(request.form['version'])):
+            PRECOMPUTE.wake()
+    except (KeyError, ValueError):
         pass
     return redirect(url_for('index'))
 
+@app.route('/admin/mentor', methods=['POST'])
+def upsert_mentor():
+    """Adds or updates one mentor (e.g. a newly approved one) without a full reindex."""
+    try:
+        mentor = {
+            'id': request.form['mentor_id'].strip(),
+            'name': request.form['name'].strip(),
+            'expertise': request.form['expertise'].strip(),
+            'description': request.form['description'].strip(),
+            'rating': float(request.form.get('rating') or 0.0),
+            'capacity': int(request.form.get('capacity') or 5)
+        }
+    except (KeyError, ValueError):
+        return redirect(url_for('index'))
+
+    if mentor['id']:
+        mentors = [m for m in load_mentors() if m['id'] != mentor['id']]
+        mentors.append(mentor)
+        save_mentors(mentors)
+        MATCHER.upsert_mentor(mentor)
+        PRECOMPUTE.wake()
+    return redirect(url_for('index'))
+
+@app.route('/admin/mentor/remove', methods=['POST'])
+def remove_mentor():
+    """Removes one mentor from the data file and the search indexes."""
+    mentor_id = request.form.get('mentor_id', '').strip()
+    if mentor_id:
+        save_mentors([m for m in load_mentors() if m['id'] != mentor_id])
+        MATCHER.remove_mentor(mentor_id)
+        PRECOMPUTE.wake()
+    return redirect(url_for('index'))
+
 @app.route('/session_analysis', methods=['GET', 'POST'])
 def session_analysis():
     """Handles mentor assignment and AI-generated advice (Teacher/Admin view)."""
 
     students = load_students()
     student_id = None
-    final_plan_html = None
-    final_match = None
-
-    weights = {
-        'vector_distance': session.get('vector_distance_weight', 1.0),
-        'historical_success': session.get('historical_success_weight', 1.0)
-    }
+    analysis = None
 
     if request.method == 'POST':
         student_id = request.form['student_id']
         student = students.get(student_id)
 
         if student:
-            mentee_query = f"I need a mentor for my weaknesses: {student['weakness_areas']}. My goal is to {student['goal']}."
-
-            # 1. Find Matches
-            initial_matches = MATCHER.find_matches(mentee_query, n_results=3)
-
-            if initial_matches:
-                # 2. Re-rank using feedback and admin weights
-                df_matches = pd.DataFrame(initial_matches)
-                if RANKER.model is not None:
-                    df_matches['success_score'] = RANKER.model.predict_proba(df_matches[['vector_distance']])[:, 1]
-                else:
-                    df_matches['success_score'] = 0.5
-
-                distance_w = weights['vector_distance']
-                success_w = weights['historical_success']
-                df_matches['final_score'] = (1 - df_matches['vector_distance']) * distance_w + df_matches['success_score'] * success_w
-
-                final_match = df_matches.sort_values(by='final_score', ascending=False).iloc[0].to_dict()
-
-                # 3. Generate AI Plan
-                final_plan_html = ADVISOR.analyze_weakness_and_suggest_plan(student, final_match)
+            analysis = analyze_student(student, current_weights())
 
     return render_template(
         'session.html',
         students=students,
         selected_student_id=student_id,
-        final_match=final_match,
-        final_plan_html=final_plan_html
+        final_match=analysis['match'] if analysis else None,
+        final_plan_html=analysis['plan_html'] if analysis else None,
+        computed_at=analysis['computed_at'] if analysis else None,
+        is_fresh=analysis['is_fresh'] if analysis else None
     )
 
 @app.route('/submit_feedback', methods=['POST'])
@@ -174,6 +274,73 @@ def student_advisor():
 
     return render_template('student_self_service.html', resources_html=resources_html, query=query)
 
+def sse_events(chunks):
+    """
+    Formats text chunks as server-sent events, ending with a 'done' (or 'error')
+    event. A None chunk is sent as a comment line to keep the connection alive.
+    """
+    try:
+        for chunk in chunks:
+            yield ": keepalive\n\n" if chunk is None else f"data: {json.dumps(chunk)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    except Exception as e:
+        print(f"Advisor stream failed: {e}")
+        yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+
+@app.route('/advisor/jobs', methods=['POST'])
+def submit_advisor_job():
+    """Queues an advisor call and returns its job ID immediately (HTTP 202)."""
+    kind = request.form.get('kind', 'resources')
+    if kind == 'resources':
+        query = request.form.get('query', '').strip()
+        if not query:
+            return jsonify({'error': 'query is required'}), 400
+        # Streamed on the worker, so /advisor/jobs/<id>/stream can tail it
+        job_id = ADVISOR_JOBS.submit(kind, ADVISOR.stream_resources, query, stream=True)
+    elif kind == 'plan':
+        student = load_students().get(request.form.get('student_id', ''))
+        if student is None:
+            return jsonify({'error': 'unknown student_id'}), 404
+        # Session weights are read here; the worker thread has no request context
+        job_id = ADVISOR_JOBS.submit(kind, analyze_student, student, current_weights())
+    else:
+        return jsonify({'error': f'unknown job kind: {kind}'}), 400
+
+    if job_id is None:
+        return jsonify({'error': 'advisor queue is full, retry later'}), 503
+    response = {'job_id': job_id, 'status_url': url_for('advisor_job_status', job_id=job_id)}
+    if kind == 'resources':
+        response['stream_url'] = url_for('advisor_job_stream', job_id=job_id)
+    return jsonify(response), 202
+
+@app.route('/advisor/jobs/<job_id>')
+def advisor_job_status(job_id):
+    """Job state and result. With ?wait=<seconds> it long-polls until the job finishes."""
+    try:
+        wait = float(request.args.get('wait', 0))
+    except ValueError:
+        wait = 0.0
+    job = ADVISOR_JOBS.wait(job_id, wait) if wait > 0 else ADVISOR_JOBS.get(job_id)
+    if job is None:
+        return jsonify({'error': 'unknown or expired job'}), 404
+    return jsonify(job)
+
+@app.route('/advisor/jobs/<job_id>/stream')
+def advisor_job_stream(job_id):
+    """
+    Tails a streaming job over server-sent events. The advisor runs on the job
+    pool; this request only forwards the chunks the worker has buffered.
+    """
+    job = ADVISOR_JOBS.get(job_id)
+    if job is None or job['kind'] != 'resources':
+        return jsonify({'error': 'unknown or expired streaming job'}), 404
+    return Response(
+        stream_with_context(sse_events(ADVISOR_JOBS.follow(job_id))),
+        mimetype='text/event-stream',
+        # Disable proxy buffering so chunks reach the browser as they are produced
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 if __name__ == '__main__':
     # You need to ensure the src/data files are present for this to run
     if not os.path.exists('src/data/students.json'):
@@ -0,0 +1,103 @@
+"""
+Recall/latency benchmark for the Chroma collection's HNSW settings.
+
+Run from the v1 directory:
+    python -m benchmarks.hnsw_params
+
+For each synthetic mentor corpus size and each HNSW setting it reports
+recall@k against exact brute force, p50/p99 query latency, build time and
+the on-disk index size. Use it to pick CHROMA_HNSW_* values per deployment.
+"""
+import os
+import shutil
+import tempfile
+import time
+import chromadb
+import numpy as np
+
+# --- Configuration ---
+DIM = 384  # all-MiniLM-L6-v2 embedding size
+CORPUS_SIZES = [1000, 10000, 50000]
+N_QUERIES = 200
+TOP_K = 5
+SEED = 11
+WRITE_BATCH = 1000
+# (M, construction_ef, search_ef) combinations to compare
+SETTINGS = [
+    (8, 50, 20),
+    (16, 100, 50),
+    (16, 100, 100),
+    (32, 200, 100),
+    (32, 200, 200),
+]
+
+def make_vectors(rng, n):
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def brute_force_top_k(vectors, queries, k):
+    """Exact squared-L2 top k, the ground truth for recall."""
+    distances = (
+        np.einsum('ij,ij->i', vectors, vectors)[np.newaxis, :]
+        - 2.0 * queries @ vectors.T
+    )
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    return [set(row) for row in top]
+
+def dir_size_mb(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / 1e6
+
+def run_setting(vectors, queries, truth, m, construction_ef, search_ef):
+    path = tempfile.mkdtemp(prefix="bench_hnsw_")
+    try:
+        client = chromadb.PersistentClient(path=path)
+        collection = client.get_or_create_collection(
+            name="bench",
+            metadata={
+                "hnsw:space": "l2",
+                "hnsw:M": m,
+                "hnsw:construction_ef": construction_ef,
+                "hnsw:search_ef": search_ef
+            }
+        )
+        ids = [str(i) for i in range(len(vectors))]
+
+        start = time.perf_counter()
+        for i in range(0, len(ids), WRITE_BATCH):
+            collection.add(ids=ids[i:i + WRITE_BATCH], embeddings=vectors[i:i + WRITE_BATCH].tolist())
+        # The first query forces any pending index build to finish
+        collection.query(query_embeddings=[queries[0].tolist()], n_results=TOP_K)
+        build = time.perf_counter() - start
+
+        latencies, hits = [], 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            result = collection.query(query_embeddings=[query.tolist()], n_results=TOP_K, include=['distances'])
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len(expected & {int(i) for i in result['ids'][0]})
+
+        recall = hits / (TOP_K * len(queries))
+        size = dir_size_mb(path)
+        del collection, client
+        return recall, np.percentile(latencies, 50), np.percentile(latencies, 99), build, size
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+def main():
+    rng = np.random.default_rng(SEED)
+    print(f"{'mentors':>8} {'M':>4} {'c_ef':>5} {'s_ef':>5} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8} {'build s':>8} {'size MB':>8}")
+
+    for n in CORPUS_SIZES:
+        vectors = make_vectors(rng, n)
+        queries = make_vectors(rng, N_QUERIES)
+        truth = brute_force_top_k(vectors, queries, TOP_K)
+
+        for m, construction_ef, search_ef in SETTINGS:
+            recall, p50, p99, build, size = run_setting(vectors, queries, truth, m, construction_ef, search_ef)
+            print(f"{n:>8} {m:>4} {construction_ef:>5} {search_ef:>5} {recall:>9.3f} {p50:>8.3f} {p99:>8.3f} {build:>8.2f} {size:>8.1f}")
+
+if __name__ == '__main__':
+    main()
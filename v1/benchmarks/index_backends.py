@@ -0,0 +1,93 @@
+"""
+Benchmarks the Chroma and NumPy mentor index backends on synthetic data.
+
+Run from the v1 directory:
+    python -m benchmarks.index_backends
+
+For each pool size it reports build time, startup time (opening an existing
+index from disk) and p50/p99 single-query latency. Random unit vectors stand
+in for mentor embeddings, so the sentence model is not needed.
+"""
+import shutil
+import tempfile
+import time
+import chromadb
+import numpy as np
+from src.vector_index import NumpyVectorIndex
+
+# --- Configuration ---
+DIM = 384  # all-MiniLM-L6-v2 embedding size
+POOL_SIZES = [500, 2000, 5000]
+N_QUERIES = 200
+TOP_K = 5
+SEED = 42
+
+def make_vectors(rng, n):
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def time_queries(query_fn, queries):
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        query_fn(q)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+def bench_chroma(path, ids, vectors, metadatas, queries):
+    start = time.perf_counter()
+    client = chromadb.PersistentClient(path=path)
+    collection = client.get_or_create_collection(name="bench")
+    # Chroma limits the size of a single write, so add in chunks
+    for i in range(0, len(ids), 1000):
+        collection.upsert(ids=ids[i:i + 1000], embeddings=vectors[i:i + 1000].tolist(), metadatas=metadatas[i:i + 1000])
+    build = time.perf_counter() - start
+    del collection, client
+
+    start = time.perf_counter()
+    client = chromadb.PersistentClient(path=path)
+    collection = client.get_or_create_collection(name="bench")
+    collection.query(query_embeddings=[queries[0].tolist()], n_results=TOP_K)
+    startup = time.perf_counter() - start
+
+    p50, p99 = time_queries(
+        lambda q: collection.query(query_embeddings=[q.tolist()], n_results=TOP_K, include=['metadatas', 'distances']),
+        queries
+    )
+    return build, startup, p50, p99
+
+def bench_numpy(path, ids, vectors, metadatas, queries):
+    start = time.perf_counter()
+    index = NumpyVectorIndex(path)
+    index.upsert(ids=ids, embeddings=vectors, metadatas=metadatas)
+    build = time.perf_counter() - start
+    del index
+
+    start = time.perf_counter()
+    index = NumpyVectorIndex(path)
+    index.query([queries[0]], n_results=TOP_K)
+    startup = time.perf_counter() - start
+
+    p50, p99 = time_queries(lambda q: index.query([q], n_results=TOP_K), queries)
+    return build, startup, p50, p99
+
+def main():
+    rng = np.random.default_rng(SEED)
+    print(f"{'backend':<8} {'mentors':>8} {'build s':>9} {'startup ms':>11} {'p50 ms':>8} {'p99 ms':>8}")
+
+    for n in POOL_SIZES:
+        vectors = make_vectors(rng, n)
+        queries = make_vectors(rng, N_QUERIES)
+        ids = [f"M{i:06d}" for i in range(n)]
+        metadatas = [{"id": mentor_id, "name": mentor_id} for mentor_id in ids]
+
+        for name, bench in (("chroma", bench_chroma), ("numpy", bench_numpy)):
+            path = tempfile.mkdtemp(prefix=f"bench_{name}_")
+            try:
+                build, startup, p50, p99 = bench(path, ids, vectors, metadatas, queries)
+            finally:
+                shutil.rmtree(path, ignore_errors=True)
+            print(f"{name:<8} {n:>8} {build:>9.2f} {startup * 1000:>11.1f} {p50:>8.3f} {p99:>8.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Measures the recall and latency impact of quantized NumPy index storage.
+
+Run from the v1 directory:
+    python -m benchmarks.quantization
+
+Every configuration is compared with the full-precision float32 index:
+recall@k is the overlap of the returned ids with the exact top k, and the
+memory column is the size of the scoring matrix. Each index is measured
+twice: in the process that built it with upsert (as the app does on every
+start) and freshly memory-mapped from disk; heap MB is what that instance
+keeps off the memory maps, which must not grow with the pool.
+
+Latency is the full scan. float16 has to be upcast in software on every
+query, so it is the slowest of the three; int8 upcasts cheaply and applies
+its per-row scale to the scores, which keeps it close to float32.
+"""
+import shutil
+import tempfile
+import time
+import numpy as np
+from src.vector_index import NumpyVectorIndex
+
+# --- Configuration ---
+DIM = 384  # all-MiniLM-L6-v2 embedding size
+N_MENTORS = 20000
+N_QUERIES = 200
+TOP_K = 5
+SEED = 7
+CONFIGS = [
+    ("float32", 0),
+    ("float16", 0),
+    ("float16", 50),
+    ("int8", 0),
+    ("int8", 50),
+]
+
+def make_vectors(rng, n):
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def run_queries(index, queries):
+    results, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        res = index.query([q], n_results=TOP_K)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(res['ids'][0])
+    return results, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+def main():
+    rng = np.random.default_rng(SEED)
+    vectors = make_vectors(rng, N_MENTORS)
+    # Queries close to real mentors, like a mentee describing a mentor's skills
+    queries = vectors[rng.choice(N_MENTORS, N_QUERIES)] + 0.25 * make_vectors(rng, N_QUERIES)
+    ids = [f"M{i:06d}" for i in range(N_MENTORS)]
+
+    exact_ids = None
+    print(f"{'dtype':<8} {'rerank':>6} {'instance':<8} {'memory MB':>10} {'heap MB':>8} "
+          f"{'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for dtype, rerank in CONFIGS:
+        path = tempfile.mkdtemp(prefix=f"bench_{dtype}_")
+        try:
+            built = NumpyVectorIndex(path, dtype=dtype, rerank_candidates=rerank)
+            built.upsert(ids=ids, embeddings=vectors)
+            loaded = NumpyVectorIndex(path, dtype=dtype, rerank_candidates=rerank)
+            for label, index in (("built", built), ("loaded", loaded)):
+                found, p50, p99 = run_queries(index, queries)
+                if exact_ids is None:
+                    exact_ids = found
+                recall = np.mean([len(set(a) & set(b)) / TOP_K for a, b in zip(found, exact_ids)])
+                print(f"{dtype:<8} {rerank:>6} {label:<8} {index.memory_bytes() / 1e6:>10.1f} "
+                      f"{index.heap_bytes() / 1e6:>8.2f} {recall:>9.3f} {p50:>8.3f} {p99:>8.3f}")
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Parity check and timing for the NumPy ranking fast path.
+
+Run from the v1 directory:
+    python -m benchmarks.ranking_fast_path
+
+Compares RankingEngine.score_matches / apply_ranking (LinearScorer) with the
+original pandas implementations (kept below as the parity reference) on
+random three-element match lists, asserts identical order and scores, and
+reports the per-call time of each path.
+"""
+import time
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from src.ranking_engine import RankingEngine
+
+# --- Configuration ---
+N_CASES = 2000
+N_MATCHES = 3
+SEED = 3
+WEIGHTS = [(1.0, 1.0), (0.0, 2.0), (2.0, 0.3), (0.5, 0.0)]
+
+def apply_ranking_pandas(model, matches):
+    """Original DataFrame implementation of RankingEngine.apply_ranking."""
+    if model is None:
+        return matches
+
+    # Create a DataFrame from the initial matches
+    df = pd.DataFrame(matches)
+
+    # Get the new ranking score (probability of success)
+    # We only use 'vector_distance' as the feature for simplicity
+    ranking_scores = model.predict_proba(df[['vector_distance']])[:, 1]
+
+    df['ranking_score'] = ranking_scores
+
+    # Sort by the new score (highest probability of success first)
+    df_ranked = df.sort_values(by='ranking_score', ascending=False)
+
+    # Convert back to a list of dictionaries
+    return df_ranked.to_dict('records')
+
+def score_matches_pandas(model, matches, distance_weight: float = 1.0, success_weight: float = 1.0):
+    """Original DataFrame implementation of RankingEngine.score_matches."""
+    df_matches = pd.DataFrame(matches)
+    if model is not None:
+        df_matches['success_score'] = model.predict_proba(df_matches[['vector_distance']])[:, 1]
+    else:
+        df_matches['success_score'] = 0.5
+
+    df_matches['final_score'] = (1 - df_matches['vector_distance']) * distance_weight + df_matches['success_score'] * success_weight
+    return df_matches.sort_values(by='final_score', ascending=False).to_dict('records')
+
+def random_matches(rng):
+    return [
+        {"id": f"M{i:03d}", "name": f"Mentor {i}", "expertise": "", "description": "",
+         "vector_distance": float(rng.uniform(0.0, 2.0))}
+        for i in range(N_MATCHES)
+    ]
+
+def assert_same(fast, reference, score_key):
+    assert [m['id'] for m in fast] == [m['id'] for m in reference], "order differs"
+    for a, b in zip(fast, reference):
+        assert np.isclose(a[score_key], b[score_key], rtol=1e-9, atol=1e-12), f"{score_key} differs"
+
+def time_per_call(fn, cases):
+    start = time.perf_counter()
+    for matches in cases:
+        fn(matches)
+    return (time.perf_counter() - start) / len(cases) * 1e6
+
+def main():
+    rng = np.random.default_rng(SEED)
+    engine = RankingEngine()
+
+    # Fit a model on synthetic feedback so the check does not depend on the data file
+    distances = pd.DataFrame({'vector_distance': rng.uniform(0.0, 2.0, size=500)})
+    labels = (distances['vector_distance'] + rng.normal(0, 0.3, 500) < 0.8).astype(int)
+    cases = [random_matches(rng) for _ in range(N_CASES)]
+
+    for label, model in (("untrained", None), ("trained", LogisticRegression().fit(distances, labels))):
+        engine.model = model
+        for distance_w, success_w in WEIGHTS:
+            for matches in cases:
+                assert_same(
+                    engine.score_matches(matches, distance_w, success_w),
+                    score_matches_pandas(model, matches, distance_w, success_w),
+                    'final_score'
+                )
+        if model is not None:
+            for matches in cases:
+                assert_same(engine.apply_ranking(matches), apply_ranking_pandas(model, matches), 'ranking_score')
+        print(f"Parity OK ({label} ranker, {N_CASES} cases x {len(WEIGHTS)} weight settings).")
+
+    fast_us = time_per_call(lambda m: engine.score_matches(m, 1.0, 1.0), cases)
+    pandas_us = time_per_call(lambda m: score_matches_pandas(engine.model, m, 1.0, 1.0), cases)
+    print(f"score_matches: numpy {fast_us:.1f} us/call, pandas {pandas_us:.1f} us/call ({pandas_us / fast_us:.0f}x)")
+
+    fast_us = time_per_call(engine.apply_ranking, cases)
+    pandas_us = time_per_call(lambda m: apply_ranking_pandas(engine.model, m), cases)
+    print(f"apply_ranking: numpy {fast_us:.1f} us/call, pandas {pandas_us:.1f} us/call ({pandas_us / fast_us:.0f}x)")
+
+if __name__ == '__main__':
+    main()
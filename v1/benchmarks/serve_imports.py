@@ -0,0 +1,64 @@
+"""
+Startup cost of the ranker serving modes and of a real serve-only worker.
+
+Run from the v1 directory (after a normal-mode process has trained and
+exported src/data/ranker_params.json):
+    python -m benchmarks.serve_imports
+
+Each mode is started in a fresh interpreter. The script reports the time to
+import and construct the components and score one match list, the peak
+resident memory and which heavy modules ended up loaded. The ranker-only
+rows isolate the scorer; the "serve-only worker" row is what app.py with
+RANKER_SERVE_ONLY=1 actually loads, including the matcher's
+sentence-transformers model.
+"""
+import json
+import subprocess
+import sys
+
+# --- Configuration ---
+MODES = {
+    "RankingEngine (sklearn + pandas)": (
+        "from src.ranking_engine import RankingEngine\n"
+        "ranker = RankingEngine()\n"
+        "ranker.load_or_train()\n"
+    ),
+    "ExportedRanker (numpy only)": (
+        "from src.fast_scorer import ExportedRanker\n"
+        "ranker = ExportedRanker()\n"
+    ),
+    "Serve-only worker (matcher + export)": (
+        "from src.ai_matcher import AIMatcher\n"
+        "from src.fast_scorer import ExportedRanker\n"
+        "matcher = AIMatcher()\n"
+        "ranker = ExportedRanker()\n"
+    ),
+}
+HEAVY_MODULES = ('sklearn', 'pandas', 'torch', 'sentence_transformers', 'chromadb')
+
+CHILD_TEMPLATE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{setup}
+ranker.score_matches([{{'id': 'M001', 'vector_distance': 0.4}}, {{'id': 'M002', 'vector_distance': 0.9}}])
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in {heavy_modules!r} if m in sys.modules)
+print(json.dumps({{'seconds': elapsed, 'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 'heavy': heavy}}))
+"""
+
+def main():
+    print(f"{'mode':<38} {'startup s':>10} {'peak RSS MB':>12}  heavy modules")
+    for name, setup in MODES.items():
+        child = subprocess.run(
+            [sys.executable, "-c", CHILD_TEMPLATE.format(setup=setup, heavy_modules=HEAVY_MODULES)],
+            capture_output=True, text=True
+        )
+        if child.returncode != 0:
+            error = (child.stderr.strip().splitlines() or ['unknown error'])[-1]
+            print(f"{name:<38} failed: {error}")
+            continue
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        print(f"{name:<38} {result['seconds']:>10.2f} {result['max_rss_mb']:>12.1f}  {', '.join(result['heavy']) or '-'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Configuration ---
+# Advisor calls (LLM latency) run on a small shared pool instead of request threads
+ADVISOR_WORKERS = int(os.environ.get("ADVISOR_WORKERS", "4"))
+# Submissions beyond this many queued/running jobs are rejected (HTTP 503)
+ADVISOR_MAX_PENDING = int(os.environ.get("ADVISOR_MAX_PENDING", "200"))
+JOB_RESULT_TTL_S = 600
+LONG_POLL_MAX_S = 25.0
+# A streaming follower yields a heartbeat (None) after this long without a new chunk
+STREAM_HEARTBEAT_S = 15.0
+
+class AdvisorJobQueue:
+    """
+    Bounded worker pool for slow advisor calls.
+
+    submit() returns a job ID immediately; the caller polls get() or
+    long-polls wait() for the result. Streaming jobs (stream=True) run a
+    generator on the worker and buffer its chunks per job, so follow() can
+    tail them while they are produced without running the generator on the
+    request thread. Finished jobs are kept for JOB_RESULT_TTL_S seconds and
+    then dropped.
+    """
+    def __init__(self, max_workers: int = ADVISOR_WORKERS, max_pending: int = ADVISOR_MAX_PENDING):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="advisor")
+        self._jobs = {}
+        self._events = {}
+        self._chunks = {}  # job ID -> chunks produced so far by a streaming job
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def submit(self, kind: str, fn, *args, stream: bool = False):
+        """
+        Queues fn(*args). Returns the job ID, or None if the queue is full.
+
+        With stream=True, fn returns an iterable of text chunks; they are
+        buffered for follow() and joined into the job result.
+        """
+        with self._lock:
+            self._purge_expired()
+            if self._pending >= self.max_pending:
+                return None
+            self._pending += 1
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'id': job_id,
+                'kind': kind,
+                'state': 'queued',
+                'result': None,
+                'error': None,
+                'submitted_at': time.time(),
+                'finished_at': None
+            }
+            self._events[job_id] = threading.Event()
+            if stream:
+                self._chunks[job_id] = []
+
+        self._executor.submit(self._run, job_id, fn, args, stream)
+        return job_id
+
+    def _run(self, job_id, fn, args, stream):
+        self._update(job_id, state='running')
+        try:
+            if stream:
+                chunks = self._chunks[job_id]
+                for chunk in fn(*args):
+                    with self._changed:
+                        chunks.append(chunk)
+                        self._changed.notify_all()
+                result = "".join(chunks)
+            else:
+                result = fn(*args)
+            self._update(job_id, state='done', result=result, finished_at=time.time())
+        except Exception as e:
+            print(f"Advisor job {job_id} failed: {e}")
+            self._update(job_id, state='failed', error=str(e), finished_at=time.time())
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._events[job_id].set()
+
+    def _update(self, job_id, **fields):
+        # Jobs are replaced as whole dicts so readers never see a half-updated one
+        with self._changed:
+            self._jobs[job_id] = dict(self._jobs[job_id], **fields)
+            self._changed.notify_all()
+
+    def _purge_expired(self):
+        cutoff = time.time() - JOB_RESULT_TTL_S
+        for job_id in [j for j, job in self._jobs.items() if job['finished_at'] and job['finished_at'] < cutoff]:
+            del self._jobs[job_id]
+            del self._events[job_id]
+            self._chunks.pop(job_id, None)
+
+    def get(self, job_id: str):
+        """Returns the job dict, or None for an unknown or expired ID."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: float):
+        """Long poll: blocks up to timeout seconds for the job to finish, then returns get()."""
+        event = self._events.get(job_id)
+        if event is not None:
+            event.wait(min(max(timeout, 0.0), LONG_POLL_MAX_S))
+        return self.get(job_id)
+
+    def follow(self, job_id: str, heartbeat_s: float = STREAM_HEARTBEAT_S):
+        """
+        Yields a streaming job's chunks from the start, as the worker produces
+        them, until the job finishes. Yields None when nothing new arrived for
+        heartbeat_s seconds. Raises KeyError for an unknown or non-streaming
+        job and RuntimeError if the job failed.
+        """
+        sent = 0
+        while True:
+            with self._changed:
+                chunks = self._chunks.get(job_id)
+                if chunks is None:
+                    raise KeyError(job_id)
+                self._changed.wait_for(
+                    lambda: len(chunks) > sent or self._jobs[job_id]['finished_at'] is not None, heartbeat_s)
+                new = chunks[sent:]
+                job = self._jobs[job_id]
+            if not new and job['finished_at'] is None:
+                yield None
+                continue
+            yield from new
+            sent += len(new)
+            if job['finished_at'] is not None and sent == len(chunks):
+                if job['state'] == 'failed':
+                    raise RuntimeError(job['error'])
+                return
+
+    @property
+    def pending(self):
+        return self._pending
@@ -1,28 +1,118 @@
 import json
-import chromadb
+import re
+import time
 from sentence_transformers import SentenceTransformer
 import os
+import numpy as np
+from src.encoder_service import BatchingEncoder
+from src.vector_index import NumpyVectorIndex
+from src.lexical_index import BM25Index
 
 # --- Configuration ---
 MODEL_NAME = 'all-MiniLM-L6-v2'
 COLLECTION_NAME = "mentor_profiles"
 DB_PATH = "./chroma_db"
+# HNSW settings for the Chroma collection. space, M and construction_ef are
+# fixed when the collection is created; delete DB_PATH to rebuild with new values.
+HNSW_SPACE = os.environ.get("CHROMA_HNSW_SPACE", "l2")  # "l2", "cosine" or "ip"
+HNSW_M = int(os.environ.get("CHROMA_HNSW_M", 16))
+HNSW_CONSTRUCTION_EF = int(os.environ.get("CHROMA_HNSW_CONSTRUCTION_EF", 100))
+HNSW_SEARCH_EF = int(os.environ.get("CHROMA_HNSW_SEARCH_EF", 100))
 DATA_PATH = "src/data/mentors.json"
+# Vector index backend: "chroma" (SQLite + HNSW) or "numpy" (in-process brute force)
+INDEX_BACKEND = os.environ.get("MATCHER_INDEX_BACKEND", "chroma")
+NUMPY_INDEX_PATH = "./numpy_index"
+# NumPy backend storage: "float32", "float16" or "int8" (scalar-quantized), and
+# how many candidates to re-rank exactly in full precision (0 disables re-ranking)
+NUMPY_INDEX_DTYPE = os.environ.get("NUMPY_INDEX_DTYPE", "float32")
+NUMPY_INDEX_RERANK = int(os.environ.get("NUMPY_INDEX_RERANK", 0))
+# Hybrid retrieval: fuse BM25 over expertise/description with vector search (opt-in,
+# since it changes the ranking find_matches returns)
+HYBRID_SEARCH = os.environ.get("MATCHER_HYBRID_SEARCH", "0") == "1"
+HYBRID_CANDIDATES = 50  # size of each candidate list before fusion
+RRF_K = 60              # reciprocal-rank fusion damping constant
+# Mentors without an explicit capacity can take this many mentees
+DEFAULT_MENTOR_CAPACITY = 5
+# Micro-batching of concurrent single-query encodes (see BatchingEncoder)
+ENCODER_MAX_WAIT_MS = float(os.environ.get("ENCODER_MAX_WAIT_MS", 5))
+ENCODER_MAX_BATCH_SIZE = int(os.environ.get("ENCODER_MAX_BATCH_SIZE", 32))
+
+def hnsw_metadata(space: str = None, m: int = None, construction_ef: int = None, search_ef: int = None) -> dict:
+    """Chroma collection metadata carrying the HNSW index settings (defaults from the config above)."""
+    return {
+        "hnsw:space": space or HNSW_SPACE,
+        "hnsw:M": m or HNSW_M,
+        "hnsw:construction_ef": construction_ef or HNSW_CONSTRUCTION_EF,
+        "hnsw:search_ef": search_ef or HNSW_SEARCH_EF
+    }
+
+def tag_key(tag: str) -> str:
+    """Metadata key for a tag. Chroma metadata is scalar-only, so tags are stored as boolean flags."""
+    return "tag_" + re.sub(r"[^a-z0-9]+", "_", tag.strip().lower()).strip("_")
+
+def build_filter(min_rating: float = None, min_capacity: int = None, tags: list = None):
+    """
+    Builds a Chroma-style `where` filter for find_matches.
+
+    `tags` matches mentors that have any of the given tags. Returns None when
+    no condition is set.
+    """
+    clauses = []
+    if min_rating is not None:
+        clauses.append({"rating": {"$gte": float(min_rating)}})
+    if min_capacity is not None:
+        clauses.append({"capacity": {"$gte": int(min_capacity)}})
+    if tags:
+        tag_clauses = [{tag_key(tag): True} for tag in tags]
+        clauses.append(tag_clauses[0] if len(tag_clauses) == 1 else {"$or": tag_clauses})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
 
 class AIMatcher:
     """Handles mentor profile indexing (embedding) and semantic matching."""
-    def __init__(self):
+    def __init__(self, backend: str = INDEX_BACKEND):
         # 1. Load the open-source Sentence Transformer Model
         self.model = SentenceTransformer(MODEL_NAME)
 
-        # 2. Initialize Chroma Vector Database Client
-        self.client = chromadb.PersistentClient(path=DB_PATH)
-        self.collection = self.client.get_or_create_collection(name=COLLECTION_NAME)
+        # 2. Initialize the vector index. Both backends expose the same
+        #    count/upsert/query calls, so the matching code below is shared.
+        self.backend = backend
+        if backend == "numpy":
+            self.client = None
+            self.collection = NumpyVectorIndex(
+                NUMPY_INDEX_PATH,
+                dtype=NUMPY_INDEX_DTYPE,
+                rerank_candidates=NUMPY_INDEX_RERANK
+            )
+        elif backend == "chroma":
+            # Imported here so NumPy-backend processes never load chromadb
+            import chromadb
+            self.client = chromadb.PersistentClient(path=DB_PATH)
+            self.collection = self.client.get_or_create_collection(
+                name=COLLECTION_NAME,
+                metadata=hnsw_metadata()
+            )
+        else:
+            raise ValueError(f"Unknown index backend: {backend}")
+
+        # 3. Shared encoder queue so concurrent requests share one forward pass
+        self.encoder = BatchingEncoder(
+            self.model,
+            max_wait_ms=ENCODER_MAX_WAIT_MS,
+            max_batch_size=ENCODER_MAX_BATCH_SIZE
+        )
 
-        print(f"Matcher initialized. Model: {MODEL_NAME}")
+        # 4. Lexical index over expertise/description, built by index_mentors
+        self.lexical = BM25Index()
+        # Bumped on every index change so cached match results can be invalidated
+        self.index_version = 0
+
+        print(f"Matcher initialized. Model: {MODEL_NAME}, Index backend: {backend}")
 
     def index_mentors(self):
-        """Loads data, generates embeddings, and indexes them in ChromaDB."""
+        """Loads data, generates embeddings, and indexes them in the vector index."""
         try:
             with open(DATA_PATH, 'r') as f:
                 mentors = json.load(f)
@@ -36,60 +126,245 @@ class AIMatcher:
         metadata_list = []
 
         for mentor in mentors:
-            # Combine relevant fields into a single text for embedding
-            full_text = f"Expertise: {mentor['expertise']}. Description: {mentor['description']}"
-
-            mentor_texts.append(full_text)
+            mentor_texts.append(self._mentor_text(mentor))
             mentor_ids.append(mentor['id'])
-
-            # Store original data as metadata
-            metadata_list.append({
-                "id": mentor['id'],
-                "name": mentor['name'],
-                "expertise": mentor['expertise'],
-                "description": mentor['description']
-            })
+            metadata_list.append(self._mentor_metadata(mentor))
 
         # Generate embeddings in a single batch
         embeddings = self.model.encode(mentor_texts).tolist()
 
-        # Add data to the Chroma collection (resets/overwrites if IDs exist)
+        # Add data to the vector index (resets/overwrites if IDs exist)
         self.collection.upsert(
             embeddings=embeddings,
             documents=mentor_texts,
-            metadatas=metadata_list,
+            metadatas=self._clear_dropped_tags(mentor_ids, metadata_list),
             ids=mentor_ids
         )
-        print(f"Successfully indexed {len(mentors)} mentors into ChromaDB.")
+        # Build the BM25 index over the same expertise/description text
+        self.lexical.build(mentor_ids, mentor_texts)
+        self.index_version += 1
+        print(f"Successfully indexed {len(mentors)} mentors into the {self.backend} index.")
+
+    def upsert_mentor(self, mentor: dict):
+        """
+        Adds or updates a single mentor without re-embedding the whole pool.
+
+        Only this mentor's vector, metadata and BM25 entry are touched.
+        """
+        start = time.perf_counter()
+        text = self._mentor_text(mentor)
+        embedding = self.encoder.encode(text).tolist()
+
+        self.collection.upsert(
+            embeddings=[embedding],
+            documents=[text],
+            metadatas=self._clear_dropped_tags([mentor['id']], [self._mentor_metadata(mentor)]),
+            ids=[mentor['id']]
+        )
+        self.lexical.upsert(mentor['id'], text)
+        self.index_version += 1
+        print(f"Upserted mentor {mentor['id']} in {(time.perf_counter() - start) * 1000:.1f} ms.")
+
+    def remove_mentor(self, mentor_id: str):
+        """Removes a single mentor from the vector and BM25 indexes."""
+        self.collection.delete(ids=[mentor_id])
+        self.lexical.remove(mentor_id)
+        self.index_version += 1
+        print(f"Removed mentor {mentor_id} from the {self.backend} index.")
+
+    def _mentor_text(self, mentor: dict) -> str:
+        """Combines relevant fields into a single text for embedding and BM25."""
+        return f"Expertise: {mentor['expertise']}. Description: {mentor['description']}"
+
+    def _mentor_metadata(self, mentor: dict) -> dict:
+        """Original mentor data plus the structured fields used for filtering."""
+        # Tags default to the comma-separated expertise entries
+        tags = mentor.get('tags') or [t.strip() for t in mentor['expertise'].split(',') if t.strip()]
+
+        metadata = {
+            "id": mentor['id'],
+            "name": mentor['name'],
+            "expertise": mentor['expertise'],
+            "description": mentor['description'],
+            "rating": float(mentor.get('rating', 0.0)),
+            "capacity": int(mentor.get('capacity', DEFAULT_MENTOR_CAPACITY)),
+            "tags": ", ".join(tags)
+        }
+        for tag in tags:
+            metadata[tag_key(tag)] = True
+        return metadata
+
+    def _clear_dropped_tags(self, mentor_ids: list, metadatas: list) -> list:
+        """
+        Sets tag flags the stored mentors have but the new metadata lacks to None.
 
-    def find_matches(self, mentee_profile: str, n_results: int = 5):
-        """Finds the top N semantically closest mentors."""
+        Chroma merges metadata on upsert and only deletes keys set to None, so
+        without this a removed tag would keep matching tag filters.
+        """
+        stored = self.collection.get(ids=mentor_ids, include=['metadatas'])
+        previous = dict(zip(stored['ids'], stored['metadatas'] or []))
+        cleared = []
+        for mentor_id, metadata in zip(mentor_ids, metadatas):
+            old_keys = (previous.get(mentor_id) or {}).keys()
+            dropped = [key for key in old_keys if key.startswith("tag_") and key not in metadata]
+            cleared.append(dict(metadata, **{key: None for key in dropped}) if dropped else metadata)
+        return cleared
+
+    def find_matches(self, mentee_profile: str, n_results: int = 5, hybrid: bool = HYBRID_SEARCH, where: dict = None):
+        """
+        Finds the top N closest mentors (hybrid BM25 + vector when enabled).
+
+        `where` is a Chroma-style metadata filter (see build_filter), applied
+        inside the index query so filtered searches need no over-fetching.
+        """
         if not self.collection.count():
-            print("ChromaDB is empty. Please run index_mentors first.")
+            print("Mentor index is empty. Please run index_mentors first.")
             return []
 
-        # Generate the mentee profile embedding
-        query_embedding = self.model.encode([mentee_profile]).tolist()
+        # Generate the mentee profile embedding (batched with concurrent callers)
+        query_embedding = [self.encoder.encode(mentee_profile).tolist()]
+
+        if hybrid and len(self.lexical):
+            dense = self.collection.query(
+                query_embeddings=query_embedding,
+                n_results=min(HYBRID_CANDIDATES, self.collection.count()),
+                where=where,
+                include=['distances']
+            )
+            return self._hybrid_search(mentee_profile, query_embedding[0], dense['ids'][0], n_results, where)
 
         # Query the Vector Database
         results = self.collection.query(
             query_embeddings=query_embedding,
             n_results=n_results,
+            where=where,
             include=['metadatas', 'distances']
         )
 
         matches = []
         if results and results['ids']:
-            for metadata, distance in zip(results['metadatas'][0], results['distances'][0]):
-                match = {
-                    "id": metadata['id'],
-                    "name": metadata['name'],
-                    "expertise": metadata['expertise'],
-                    "description": metadata['description'],
-                    "vector_distance": distance # The initial semantic score (lower is better)
-                }
-                matches.append(match)
+            matches = self._build_matches(results['metadatas'][0], results['distances'][0])
+
+        return matches
+
+    def _hybrid_search(self, mentee_profile: str, query_embedding, dense_ids: list, n_results: int, where: dict = None):
+        """
+        Fuses BM25 and vector rankings with reciprocal-rank fusion.
 
+        `dense_ids` are the vector index's top HYBRID_CANDIDATES for the query.
+        The candidate set is their union with the BM25 top HYBRID_CANDIDATES,
+        so mentors that are semantically close but share no token with the
+        query can still be returned.
+        """
+        lexical_hits = self.lexical.search(mentee_profile, top_n=HYBRID_CANDIDATES)
+        lexical_ids = [mentor_id for mentor_id, _ in lexical_hits]
+
+        candidate_ids = list(dict.fromkeys(list(dense_ids) + lexical_ids))
+        candidates = self.collection.get(ids=candidate_ids, where=where, include=['embeddings', 'metadatas'])
+        if not candidates['ids']:
+            return []
+
+        # Exact vector distances (same metric as the index) for the candidates only
+        vectors = np.asarray(candidates['embeddings'], dtype=np.float32)
+        distances = self._vector_distances(vectors, np.asarray(query_embedding, dtype=np.float32))
+
+        vector_ranks = {candidates['ids'][i]: rank for rank, i in enumerate(np.argsort(distances))}
+        lexical_ranks = {mentor_id: rank for rank, mentor_id in enumerate(lexical_ids)}
+
+        fused = {}
+        for mentor_id in candidates['ids']:
+            score = 1.0 / (RRF_K + vector_ranks[mentor_id] + 1)
+            if mentor_id in lexical_ranks:
+                score += 1.0 / (RRF_K + lexical_ranks[mentor_id] + 1)
+            fused[mentor_id] = score
+
+        positions = {mentor_id: i for i, mentor_id in enumerate(candidates['ids'])}
+        top_ids = sorted(fused, key=fused.get, reverse=True)[:n_results]
+
+        matches = self._build_matches(
+            [candidates['metadatas'][positions[mentor_id]] for mentor_id in top_ids],
+            [float(distances[positions[mentor_id]]) for mentor_id in top_ids]
+        )
+        for match in matches:
+            match['fusion_score'] = fused[match['id']]
+        return matches
+
+    def _vector_distances(self, vectors, query):
+        """Distances in the index's metric space, so hybrid and dense results agree."""
+        space = HNSW_SPACE if self.backend == "chroma" else "l2"
+        if space == "cosine":
+            norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+            return 1.0 - (vectors @ query) / np.maximum(norms, 1e-12)
+        if space == "ip":
+            return 1.0 - vectors @ query
+        diffs = vectors - query
+        return np.einsum('ij,ij->i', diffs, diffs)
+
+    def find_matches_batch(self, mentee_profiles: list, n_results: int = 5, batch_size: int = 256,
+                           where: dict = None, hybrid: bool = HYBRID_SEARCH):
+        """
+        Finds the top N mentors for many mentees at once.
+
+        All profiles are embedded in one batched encode call and sent to the
+        vector index as a single multi-embedding query. Returns one match list
+        per mentee, in the same order as `mentee_profiles`, ranked exactly as
+        find_matches would rank each of them (including hybrid fusion).
+        """
+        if not mentee_profiles:
+            return []
+        if not self.collection.count():
+            print("Mentor index is empty. Please run index_mentors first.")
+            return [[] for _ in mentee_profiles]
+
+        start = time.perf_counter()
+
+        # Generate all mentee embeddings in one batched forward pass
+        query_embeddings = self.model.encode(mentee_profiles, batch_size=batch_size).tolist()
+        encoded_at = time.perf_counter()
+
+        # One multi-embedding query instead of N separate round trips
+        hybrid = hybrid and len(self.lexical) > 0
+        results = self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=min(HYBRID_CANDIDATES, self.collection.count()) if hybrid else n_results,
+            where=where,
+            include=['metadatas', 'distances']
+        )
+
+        if hybrid:
+            # Same fusion as find_matches, fed with this query's share of the dense results
+            all_matches = [
+                self._hybrid_search(profile, embedding, dense_ids, n_results, where)
+                for profile, embedding, dense_ids in zip(mentee_profiles, query_embeddings, results['ids'])
+            ]
+        else:
+            all_matches = [
+                self._build_matches(metadatas, distances)
+                for metadatas, distances in zip(results['metadatas'], results['distances'])
+            ]
+        queried_at = time.perf_counter()
+
+        total = queried_at - start
+        throughput = len(mentee_profiles) / total if total > 0 else float('inf')
+        print(
+            f"Batch matched {len(mentee_profiles)} mentees in {total:.2f}s "
+            f"(encode {encoded_at - start:.2f}s, query {queried_at - encoded_at:.2f}s, "
+            f"{throughput:.0f} mentees/s)."
+        )
+        return all_matches
+
+    def _build_matches(self, metadatas, distances):
+        """Converts one row of Chroma query results into match dictionaries."""
+        matches = []
+        for metadata, distance in zip(metadatas, distances):
+            match = {
+                "id": metadata['id'],
+                "name": metadata['name'],
+                "expertise": metadata['expertise'],
+                "description": metadata['description'],
+                "vector_distance": distance # The initial semantic score (lower is better)
+            }
+            matches.append(match)
         return matches
 
 # Example usage (will be used by app.py)
@@ -103,3 +378,8 @@ if __name__ == '__main__':
     print("\n--- Initial Semantic Matches ---")
     for match in top_matches:
         print(f"Match: {match['name']}, Distance: {match['vector_distance']:.4f}")
+
+    # Batch matching for a whole cohort (e.g. term-start re-matching)
+    cohort_queries = [mentee_query] * 100
+    cohort_matches = matcher.find_matches_batch(cohort_queries, n_results=3)
+    print(f"Top match for first mentee in cohort: {cohort_matches[0][0]['name']}")
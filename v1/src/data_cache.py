@@ -0,0 +1,74 @@
+import json
+import os
+import threading
+import time
+
+# --- Configuration ---
+# How often (seconds) a cached file is stat'ed for changes; 0 checks on every access
+DATA_RECHECK_S = float(os.environ.get("DATA_RECHECK_S", "1.0"))
+
+class JsonFileCache:
+    """
+    Parsed contents of a JSON data file, kept in memory and revalidated by mtime.
+
+    get() costs one os.stat at most every recheck_s seconds; the file is only
+    re-read and re-parsed when its mtime or size changed, so request latency
+    does not grow with the file. Values are shared between requests and must
+    be treated as read-only; write() replaces the file and the cache together.
+    """
+    def __init__(self, path: str, transform=None, default=None, recheck_s: float = DATA_RECHECK_S):
+        self.path = path
+        self.transform = transform
+        self.default = default
+        self.recheck_s = recheck_s
+        self.version = 0  # bumped whenever the cached value changes
+        self._value = default
+        self._signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _set(self, data, signature):
+        self._value = self.transform(data) if self.transform else data
+        self._signature = signature
+        self.version += 1
+
+    def get(self):
+        """Returns the cached value, reloading the file first if it changed on disk."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._value
+
+        with self._lock:
+            self._next_check = now + self.recheck_s
+            signature = self._stat_signature()
+            if signature == self._signature:
+                return self._value
+            if signature is None:
+                # File removed: fall back to the empty default
+                self._value, self._signature = self.default, None
+                self.version += 1
+                return self._value
+            try:
+                with open(self.path, 'r') as f:
+                    self._set(json.load(f), signature)
+                print(f"Loaded {self.path} (cache version {self.version}).")
+            except (OSError, json.JSONDecodeError) as e:
+                # Keep serving the last good value, e.g. while another process writes the file
+                print(f"Could not reload {self.path}: {e}")
+        return self._value
+
+    def write(self, data):
+        """Writes data to the file (atomic rename) and refreshes the cache with it."""
+        with self._lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+            self._set(data, self._stat_signature())
@@ -0,0 +1,112 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# --- Configuration ---
+DEFAULT_MAX_WAIT_MS = 5
+DEFAULT_MAX_BATCH_SIZE = 32
+# Upper bound on how long encode() waits for its batch (a wedged model must not hang requests)
+DEFAULT_ENCODE_TIMEOUT_S = 30.0
+
+class BatchingEncoder:
+    """
+    Thread-safe micro-batching wrapper around a SentenceTransformer model.
+
+    Concurrent callers (e.g. several Flask threads hitting /session_analysis)
+    each submit a single text. A background worker collects requests for up to
+    `max_wait_ms` or until `max_batch_size` texts are waiting, runs them as one
+    batched forward pass and hands each caller back its own vector.
+    """
+    def __init__(self, model, max_wait_ms: float = DEFAULT_MAX_WAIT_MS, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        self.model = model
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max(1, int(max_batch_size))
+
+        # Simple counters for monitoring batch efficiency
+        self.batches_run = 0
+        self.texts_encoded = 0
+
+        self._requests = queue.Queue()
+        self._stopped = threading.Event()
+        # Orders submit() against shutdown() so nothing is queued behind the stop marker
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="batching-encoder", daemon=True)
+        self._worker.start()
+
+    def encode(self, text: str, timeout: float = DEFAULT_ENCODE_TIMEOUT_S):
+        """
+        Encodes a single text, blocking until its batch has been processed.
+        Raises concurrent.futures.TimeoutError after `timeout` seconds.
+        """
+        return self.submit(text).result(timeout=timeout)
+
+    def submit(self, text: str) -> Future:
+        """Queues a text for encoding and returns a Future for its vector."""
+        future = Future()
+        with self._lock:
+            if self._stopped.is_set():
+                raise RuntimeError("BatchingEncoder has been shut down.")
+            self._requests.put((text, future))
+        return future
+
+    def shutdown(self):
+        """Stops the worker thread after the current batch finishes."""
+        with self._lock:
+            if not self._stopped.is_set():
+                self._stopped.set()
+                self._requests.put(None)
+        self._worker.join()
+
+    def _collect_batch(self):
+        """Blocks for the first request, then gathers more until the wait or size limit."""
+        first = self._requests.get()
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Shutdown requested: finish what we already have
+                self._stopped.set()
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                break
+
+            texts = [text for text, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                vectors = self.model.encode(texts, batch_size=len(texts))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            for future, vector in zip(futures, vectors):
+                future.set_result(vector)
+
+            self.batches_run += 1
+            self.texts_encoded += len(texts)
+
+        # Fail anything still queued so callers do not hang forever
+        while True:
+            try:
+                item = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(RuntimeError("BatchingEncoder has been shut down."))
@@ -0,0 +1,201 @@
+import json
+import os
+import time
+import numpy as np
+from src.feedback_store import (FeedbackStore, FEEDBACK_FILE, FEEDBACK_LOG_FILE, FEEDBACK_SNAPSHOT_PREFIX,
+                                COMPACTION_MIN_ROWS)
+from src.model_registry import ModelRegistry
+
+# --- Configuration ---
+# Tiny parameter file exported after every refit, rollback and online update (no pickle, no scikit-learn)
+SCORER_PARAMS_FILE = "src/data/ranker_params.json"
+PARAMS_FORMAT_VERSION = 1
+PARAMS_RECHECK_S = 5
+# Serve-only workers compact the shared feedback log only when it is far past the
+# training process's threshold, i.e. when no training process is compacting it
+SERVE_ONLY_COMPACTION_MIN_ROWS = 10 * COMPACTION_MIN_ROWS
+
+def next_export_version(path: str = SCORER_PARAMS_FILE) -> int:
+    """
+    Export counter that keeps increasing across training-process restarts
+    (registry versions start at 1 in every process), read from the last export.
+    """
+    try:
+        with open(path, 'r') as f:
+            return int(json.load(f).get('export_version', 0)) + 1
+    except (FileNotFoundError, ValueError, TypeError, AttributeError):
+        return 1
+
+class LinearScorer:
+    """
+    DataFrame-free scorer for the ranker's logistic model.
+
+    The ranker is a logistic function over a single feature (vector_distance),
+    so scoring a handful of matches only needs its coefficient and intercept.
+    This avoids building a pandas DataFrame, calling predict_proba and sorting
+    with sort_values on every request.
+    """
+    def __init__(self, coef: float = None, intercept: float = 0.0):
+        self.coef = coef
+        self.intercept = intercept
+
+    @classmethod
+    def from_model(cls, model):
+        """Builds a scorer from a fitted scikit-learn linear classifier (or None)."""
+        if model is None:
+            return cls()
+        return cls(float(model.coef_.ravel()[0]), float(model.intercept_.ravel()[0]))
+
+    def save(self, path: str, metadata: dict = None):
+        """Exports the parameters as a small JSON file (atomic rename)."""
+        params = dict(metadata or {})
+        params.update({
+            'format_version': PARAMS_FORMAT_VERSION,
+            'feature': 'vector_distance',
+            'coef': self.coef,
+            'intercept': self.intercept,
+            'exported_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        })
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(params, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """Loads an exported parameter file. Returns (scorer, params)."""
+        with open(path, 'r') as f:
+            params = json.load(f)
+        if params.get('format_version') != PARAMS_FORMAT_VERSION:
+            raise ValueError(f"Unsupported ranker params format: {params.get('format_version')}")
+        return cls(params['coef'], params['intercept']), params
+
+    def success_proba(self, distances):
+        """Probability of a successful match for each vector distance."""
+        if self.coef is None:
+            # Untrained ranker: neutral score, as in the original pandas path
+            return np.full(len(distances), 0.5)
+        return 1.0 / (1.0 + np.exp(-(distances * self.coef + self.intercept)))
+
+    def score_matches(self, matches, distance_weight: float = 1.0, success_weight: float = 1.0):
+        """
+        Adds success_score and final_score to each match and returns them best first.
+
+        final_score = (1 - vector_distance) * distance_weight + success_score * success_weight
+        """
+        if not matches:
+            return []
+        distances = np.fromiter((m['vector_distance'] for m in matches), dtype=np.float64, count=len(matches))
+        success = self.success_proba(distances)
+        final = (1.0 - distances) * distance_weight + success * success_weight
+
+        order = np.argsort(-final, kind='stable')
+        return [
+            dict(matches[i], success_score=float(success[i]), final_score=float(final[i]))
+            for i in order
+        ]
+
+    def rank_by_success(self, matches):
+        """Adds ranking_score (success probability) and sorts by it, best first."""
+        if not matches:
+            return []
+        distances = np.fromiter((m['vector_distance'] for m in matches), dtype=np.float64, count=len(matches))
+        success = self.success_proba(distances)
+        order = np.argsort(-success, kind='stable')
+        return [dict(matches[i], ranking_score=float(success[i])) for i in order]
+
+class ExportedRanker:
+    """
+    Serve-only stand-in for RankingEngine that needs neither scikit-learn nor pandas.
+
+    It scores with the parameters exported by the training process and picks
+    up new exports by polling the file's mtime. Feedback is still appended to
+    the shared log; retraining and rollback stay with the training process.
+    The training process normally compacts that log. If none is running, the
+    log would grow forever, so serve-only workers also compact it once it
+    passes SERVE_ONLY_COMPACTION_MIN_ROWS (pandas is only imported then).
+    """
+    def __init__(self, params_path: str = SCORER_PARAMS_FILE):
+        self.params_path = params_path
+        self.model = None
+        self.registry = ModelRegistry()  # no local versions in serve-only mode
+        self.retrain_status = {'state': 'serve-only', 'started_at': None, 'finished_at': None, 'result': None}
+        self.store = FeedbackStore(FEEDBACK_LOG_FILE, FEEDBACK_SNAPSHOT_PREFIX, seed_path=FEEDBACK_FILE)
+        self.store.start_background_compaction(min_rows=SERVE_ONLY_COMPACTION_MIN_ROWS)
+        self.scorer = LinearScorer()
+        self.params = {}
+        self._params_mtime = None
+        self._next_check = 0.0
+        self._added_feedback = 0
+        self._refresh()
+
+    def _refresh(self):
+        """Reloads the parameter file if it changed since the last check."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + PARAMS_RECHECK_S
+        try:
+            mtime = os.stat(self.params_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._params_mtime:
+            return
+        try:
+            self.scorer, self.params = LinearScorer.load(self.params_path)
+            self._params_mtime = mtime
+            print(f"Loaded exported ranker params (export {self.params.get('export_version')}, "
+                  f"model version {self.params.get('version')}).")
+        except (ValueError, KeyError, json.JSONDecodeError) as e:
+            print(f"Could not load exported ranker params: {e}")
+
+    @property
+    def feedback_count(self):
+        return self.params.get('feedback_rows', 0) + self._added_feedback
+
+    @property
+    def model_version(self):
+        """
+        Export counter of the parameters currently used for scoring. Unlike the
+        training process's registry version it changes on every export
+        (including online updates) and never restarts.
+        """
+        self._refresh()
+        return self.params.get('export_version')
+
+    @property
+    def scorer(self):
+        self._refresh()
+        return self._scorer
+
+    @scorer.setter
+    def scorer(self, scorer):
+        self._scorer = scorer
+
+    def score_matches(self, matches, distance_weight: float = 1.0, success_weight: float = 1.0):
+        return self.scorer.score_matches(matches, distance_weight, success_weight)
+
+    def apply_ranking(self, matches):
+        scorer = self.scorer
+        if scorer.coef is None:
+            return matches
+        return scorer.rank_by_success(matches)
+
+    def add_feedback(self, mentor_id, mentee_query, vector_distance, success_rating):
+        """Appends feedback to the shared log; the training process learns from it."""
+        self.store.append({
+            'mentor_id': mentor_id,
+            'mentee_query': mentee_query,
+            'vector_distance': vector_distance,
+            'success_rating': success_rating,
+            'success': 1 if success_rating >= 4 else 0
+        })
+        self._added_feedback += 1
+
+    def retrain_async(self, model_selection: bool = None):
+        print("Serve-only worker: retraining runs in the training process.")
+        return False
+
+    def rollback(self, version: int):
+        print("Serve-only worker: rollback runs in the training process.")
+        return False
@@ -0,0 +1,265 @@
+import csv
+import glob
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl  # Serializes appends and compaction across worker processes (POSIX only)
+except ImportError:
+    fcntl = None
+
+# --- Configuration ---
+# Seed data shipped with the repo; read until the first snapshot includes it, never modified
+FEEDBACK_FILE = "src/data/feedback_data.csv"
+# Live append-only log (sealed segments are feedback_log.csv.<generation>)
+FEEDBACK_LOG_FILE = "src/data/feedback_log.csv"
+# Columnar snapshots written by log compaction (feedback_snapshot.<generation>.parquet)
+FEEDBACK_SNAPSHOT_PREFIX = "src/data/feedback_snapshot"
+FEEDBACK_COLUMNS = ['mentor_id', 'mentee_query', 'vector_distance', 'success_rating', 'success']
+COMPACTION_INTERVAL_S = 60
+COMPACTION_MIN_ROWS = 1000
+
+class FeedbackStore:
+    """
+    Append-only feedback log with periodic compaction into a columnar snapshot.
+
+    Each new feedback is one CSV line appended to `log_path` and fsync'ed, so
+    ingest cost does not grow with history. Until the first snapshot exists,
+    the read-only `seed_path` CSV is loaded as the base data. Compaction folds
+    the log into a Parquet snapshot using generation-numbered files, which
+    keeps every step crash-safe:
+
+      1. the live log is renamed to `<log_path>.<g+1>` (a sealed segment)
+      2. snapshot g + segment g+1 are written to `<snapshot_prefix>.<g+1>.parquet`
+      3. the old snapshot and the sealed segment are deleted
+
+    On load, the newest snapshot is read together with any sealed segments
+    newer than it and the live log. Leftovers from an interrupted compaction
+    are either re-read or cleaned up, never counted twice.
+
+    Several worker processes may share the files: appends and sealing take an
+    flock on `<log_path>.lock`, loads and compactions one on
+    `<snapshot_prefix>.lock` (in addition to the in-process locks). The
+    compaction trigger counts the rows of the log on disk, so it sees the
+    appends of every process, not just its own.
+    """
+    def __init__(self, log_path: str, snapshot_prefix: str, seed_path: str = None):
+        self.log_path = log_path
+        self.snapshot_prefix = snapshot_prefix
+        self.seed_path = seed_path
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._counted = (None, 0, 0)  # (log inode, bytes counted, lines) for log_rows
+        self._stop = threading.Event()
+        self._thread = None
+
+    @contextmanager
+    def _locked(self, thread_lock, lock_path):
+        """Holds thread_lock and, where available, an exclusive flock on lock_path."""
+        with thread_lock:
+            lock_file = open(lock_path, 'w')
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+
+    def _log_locked(self):
+        return self._locked(self._lock, self.log_path + ".lock")
+
+    def _compaction_locked(self):
+        return self._locked(self._compact_lock, self.snapshot_prefix + ".lock")
+
+    # --- Reading ---
+
+    def _snapshots(self):
+        """(generation, path) pairs for the snapshot files on disk, oldest first."""
+        pattern = re.compile(re.escape(self.snapshot_prefix) + r"\.(\d+)\.parquet$")
+        found = []
+        for path in glob.glob(glob.escape(self.snapshot_prefix) + ".*.parquet"):
+            match = pattern.search(path)
+            if match:
+                found.append((int(match.group(1)), path))
+        return sorted(found)
+
+    def _segments(self):
+        """(generation, path) pairs for sealed log segments awaiting compaction."""
+        pattern = re.compile(re.escape(self.log_path) + r"\.(\d+)$")
+        found = []
+        for path in glob.glob(glob.escape(self.log_path) + ".*"):
+            match = pattern.search(path)
+            if match:
+                found.append((int(match.group(1)), path))
+        return sorted(found)
+
+    def _read_csv(self, path):
+        import pandas as pd
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            return pd.read_csv(path)
+        return None
+
+    def load(self):
+        """Returns all stored feedback as one DataFrame (snapshot + segments + live log)."""
+        # pandas is imported lazily so append-only users (serve-only workers) stay light
+        import pandas as pd
+        with self._compaction_locked():
+            frames = []
+            snapshots = self._snapshots()
+            generation = 0
+            if snapshots:
+                generation, path = snapshots[-1]
+                frames.append(pd.read_parquet(path))
+                # Older generations left behind by an interrupted compaction
+                for _, old_path in snapshots[:-1]:
+                    os.remove(old_path)
+            elif self.seed_path:
+                seed = self._read_csv(self.seed_path)
+                if seed is not None:
+                    frames.append(seed)
+
+            for seg_generation, path in self._segments():
+                if seg_generation <= generation:
+                    # Already folded into the snapshot by an interrupted compaction
+                    os.remove(path)
+                    continue
+                frame = self._read_csv(path)
+                if frame is not None:
+                    frames.append(frame)
+
+            with self._log_locked():
+                live = self._read_csv(self.log_path)
+            if live is not None:
+                frames.append(live)
+
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=FEEDBACK_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def exists(self):
+        seeded = self.seed_path is not None and os.path.exists(self.seed_path)
+        return seeded or os.path.exists(self.log_path) or bool(self._snapshots()) or bool(self._segments())
+
+    # --- Writing ---
+
+    def append(self, row: dict):
+        """Appends one feedback row to the live log and flushes it to disk."""
+        # The flock makes the empty-log check and the header write atomic across processes
+        with self._log_locked():
+            write_header = not os.path.exists(self.log_path) or os.path.getsize(self.log_path) == 0
+            with open(self.log_path, 'a', newline='') as f:
+                writer = csv.writer(f)
+                if write_header:
+                    writer.writerow(FEEDBACK_COLUMNS)
+                writer.writerow([row.get(column) for column in FEEDBACK_COLUMNS])
+                f.flush()
+                os.fsync(f.fileno())
+
+    def compact(self, min_rows: int = 0):
+        """
+        Folds the live log (and any sealed segments) into a new snapshot
+        generation. The live log is only sealed if it still holds min_rows
+        rows once the locks are held (another process may have just compacted).
+        """
+        import pandas as pd
+        with self._compaction_locked():
+            snapshots = self._snapshots()
+            generation = snapshots[-1][0] if snapshots else 0
+            pending = [(g, path) for g, path in self._segments() if g > generation]
+            next_generation = max([generation] + [g for g, _ in pending]) + 1
+
+            # 1. Seal the live log; new appends start a fresh file
+            with self._log_locked():
+                if (os.path.exists(self.log_path) and os.path.getsize(self.log_path) > 0
+                        and self._count_log_rows() >= min_rows):
+                    sealed = f"{self.log_path}.{next_generation}"
+                    os.replace(self.log_path, sealed)
+                    pending.append((next_generation, sealed))
+
+            if not pending:
+                return False
+
+            # 2. Merge into the next snapshot generation (the first one starts from the seed)
+            if snapshots:
+                frames = [pd.read_parquet(snapshots[-1][1])]
+            else:
+                seed = self._read_csv(self.seed_path) if self.seed_path else None
+                frames = [seed] if seed is not None else []
+            for _, path in pending:
+                frame = self._read_csv(path)
+                if frame is not None:
+                    frames.append(frame)
+            frames = [frame for frame in frames if not frame.empty]
+            merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=FEEDBACK_COLUMNS)
+
+            new_path = f"{self.snapshot_prefix}.{next_generation}.parquet"
+            tmp_path = new_path + ".tmp"
+            merged.to_parquet(tmp_path, index=False)
+            with open(tmp_path, 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(tmp_path, new_path)
+
+            # 3. Drop what the new snapshot now contains
+            for _, path in snapshots:
+                os.remove(path)
+            for _, path in pending:
+                os.remove(path)
+
+            print(f"Compacted feedback log into {new_path} ({len(merged)} rows).")
+            return True
+
+    # --- Background compaction ---
+
+    def _count_log_rows(self):
+        """
+        Rows in the live log on disk, appended by any process. Counted
+        incrementally from the last position; restarts when the log was sealed
+        and replaced by a new file.
+        """
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            self._counted = (None, 0, 0)
+            return 0
+        inode, offset, lines = self._counted
+        if inode != stat.st_ino or stat.st_size < offset:
+            offset, lines = 0, 0
+        with open(self.log_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(stat.st_size - offset)
+        complete = data.rfind(b'\n') + 1  # a line still being appended is counted next time
+        lines += data.count(b'\n', 0, complete)
+        self._counted = (stat.st_ino, offset + complete, lines)
+        return max(lines - 1, 0)  # minus the header
+
+    @property
+    def log_rows(self):
+        """Rows currently in the live (uncompacted) log, from every process."""
+        return self._count_log_rows()
+
+    def start_background_compaction(self, interval_s: float = COMPACTION_INTERVAL_S, min_rows: int = COMPACTION_MIN_ROWS):
+        """Starts a daemon thread that compacts whenever the live log holds min_rows or more."""
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval_s):
+                if self.log_rows >= min_rows:
+                    try:
+                        self.compact(min_rows)
+                    except Exception as e:
+                        print(f"Feedback compaction failed: {e}")
+
+        self._thread = threading.Thread(target=run, name="feedback-compaction", daemon=True)
+        self._thread.start()
+
+    def stop_background_compaction(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
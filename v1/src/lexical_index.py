@@ -0,0 +1,87 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+# --- Configuration ---
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Keeps skill tokens such as "c++", "c#" and "node.js" in one piece
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[a-z0-9]+)*[+#]*")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "for", "from", "help",
+    "i", "in", "is", "it", "me", "mentor", "my", "need", "of", "on", "or", "the",
+    "to", "with", "want", "who", "you", "your"
+}
+
+def tokenize(text: str):
+    """Lower-cases text and splits it into BM25 terms, dropping stopwords."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+class BM25Index:
+    """
+    Small in-process BM25 inverted index over mentor profile text.
+
+    Exact skill tokens ("Terraform", "PyTorch", "Kubernetes") score highly here
+    even when a dense embedding ranks a vaguely related profile above them.
+    Documents can be added, replaced or removed one at a time.
+    """
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)  # term -> {doc_id: term frequency}
+        self.doc_terms = {}                # doc_id -> Counter of its terms
+        self.doc_lengths = {}              # doc_id -> number of terms
+        self.total_length = 0
+
+    def build(self, doc_ids, texts):
+        """Replaces the index contents with the given documents."""
+        self.postings = defaultdict(dict)
+        self.doc_terms = {}
+        self.doc_lengths = {}
+        self.total_length = 0
+        for doc_id, text in zip(doc_ids, texts):
+            self.upsert(doc_id, text)
+
+    def upsert(self, doc_id, text: str):
+        """Adds a document, replacing any previous version with the same id."""
+        self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        self.doc_terms[doc_id] = terms
+        self.doc_lengths[doc_id] = sum(terms.values())
+        self.total_length += self.doc_lengths[doc_id]
+        for term, freq in terms.items():
+            self.postings[term][doc_id] = freq
+
+    def remove(self, doc_id):
+        """Removes a document if present."""
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        for term in terms:
+            docs = self.postings[term]
+            docs.pop(doc_id, None)
+            if not docs:
+                del self.postings[term]
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    def search(self, query: str, top_n: int = 20):
+        """Returns up to top_n (doc_id, score) pairs with a positive BM25 score, best first."""
+        if not self.doc_terms:
+            return []
+
+        n_docs = len(self.doc_terms)
+        avg_doc_length = self.total_length / n_docs or 1.0
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, freq in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_doc_length)
+                scores[doc_id] += idf * freq * (self.k1 + 1) / (freq + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_n]
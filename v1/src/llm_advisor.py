@@ -1,6 +1,10 @@
 import time
 import json
 
+# --- Configuration ---
+# Simulated generation time of suggest_resources, spread across the streamed chunks
+RESOURCES_LATENCY_S = 1.0
+
 class LLMAdvisor:
     """
     Simulates a Large Language Model (LLM) for generating personalized advice
@@ -44,8 +48,15 @@ class LLMAdvisor:
 
     def suggest_resources(self, query: str) -> str:
         """Suggests materials and study plans based on a free-form student query."""
-        time.sleep(1)
+        return "".join(self.stream_resources(query))
+
+    def stream_resources(self, query: str):
+        """
+        Yields the suggestions line by line as they are "generated".
 
+        The first chunk is available immediately; the total time matches
+        suggest_resources, like a streaming LLM response.
+        """
         suggestions = f"""
         #### Suggested Resources for: "{query}"
 
@@ -61,4 +72,7 @@ class LLMAdvisor:
         * **Week 3:** Start building a small, end-to-end project on Kaggle. Focus on feature engineering.
         * **Week 4:** Meet with your mentor to review your project structure and discuss potential production challenges.
         """
-        return suggestions
+        lines = suggestions.splitlines(keepends=True)
+        for line in lines:
+            yield line
+            time.sleep(RESOURCES_LATENCY_S / len(lines))
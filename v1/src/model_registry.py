@@ -0,0 +1,75 @@
+import threading
+import time
+
+# --- Configuration ---
+MAX_MODEL_VERSIONS = 10
+
+class ModelRegistry:
+    """
+    Keeps a bounded, versioned history of trained ranker models.
+
+    A model is published as a whole new object and becomes active with a
+    single reference swap, so serving threads never see a half-trained model.
+    Older versions stay available for rollback.
+    """
+    def __init__(self, max_versions: int = MAX_MODEL_VERSIONS):
+        self.max_versions = max_versions
+        self._lock = threading.Lock()
+        self._versions = []
+        self._next_version = 1
+        self.active_version = None
+
+    def publish(self, model, metrics: dict) -> int:
+        """Adds a model as the newest version and makes it active. Returns its version number."""
+        with self._lock:
+            version = self._next_version
+            self._next_version += 1
+            self._versions.append({
+                'version': version,
+                'model': model,
+                'metrics': metrics,
+                'created_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+            # Drop the oldest versions, but never the active one
+            while len(self._versions) > self.max_versions:
+                oldest = self._versions[0]
+                if oldest['version'] == self.active_version and len(self._versions) > 1:
+                    self._versions.pop(1)
+                else:
+                    self._versions.pop(0)
+            self.active_version = version
+            return version
+
+    def replace(self, version: int, model, metrics: dict) -> bool:
+        """
+        Swaps the model of an existing version in place (e.g. further online
+        updates of the same online model). Returns False if it was dropped.
+        """
+        with self._lock:
+            for i, entry in enumerate(self._versions):
+                if entry['version'] == version:
+                    self._versions[i] = dict(entry, model=model, metrics=metrics)
+                    return True
+        return False
+
+    def rollback(self, version: int):
+        """Makes an earlier version active again. Returns its model, or None if unknown."""
+        with self._lock:
+            for entry in self._versions:
+                if entry['version'] == version:
+                    self.active_version = version
+                    return entry['model']
+        return None
+
+    def history(self):
+        """Version metadata (without the model objects), newest first."""
+        with self._lock:
+            return [
+                {
+                    'version': entry['version'],
+                    'metrics': entry['metrics'],
+                    'created_at': entry['created_at'],
+                    'active': entry['version'] == self.active_version
+                }
+                for entry in reversed(self._versions)
+            ]
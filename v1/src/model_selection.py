@@ -0,0 +1,141 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+import numpy as np
+from joblib.externals.loky import get_reusable_executor
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.model_selection import StratifiedKFold
+
+# --- Configuration ---
+CV_FOLDS = 5
+# Above this many rows, cross-validation runs on a stratified sample; the winner is refit on all rows
+MAX_CV_ROWS = 50000
+TIME_BUDGET_S = 30.0
+N_JOBS = -1  # all cores
+
+# Candidates stay linear log-loss models: the serving path (LinearScorer and the
+# exported params) only needs a coefficient and an intercept.
+CANDIDATES = (
+    [("logreg", LogisticRegression(C=c)) for c in (1.0, 0.1, 10.0, 0.01, 100.0, 0.001)]
+    + [("logreg_balanced", LogisticRegression(C=c, class_weight='balanced')) for c in (1.0, 0.1)]
+    + [("sgd_log", SGDClassifier(loss='log_loss', alpha=a, random_state=42)) for a in (1e-4, 1e-3, 1e-2)]
+)
+
+def _evaluate_fold(estimator, X, y, train_idx, test_idx):
+    """Fits one candidate on one fold and returns (log loss, accuracy)."""
+    model = clone(estimator)
+    model.fit(X[train_idx], y[train_idx])
+    proba = model.predict_proba(X[test_idx])[:, 1]
+    return (
+        log_loss(y[test_idx], proba, labels=[0, 1]),
+        accuracy_score(y[test_idx], (proba >= 0.5).astype(int))
+    )
+
+class ModelSelector:
+    """
+    Parallel k-fold model selection for the v1 ranker.
+
+    Every (candidate, fold) fit is an independent task on a reusable process
+    pool spread over all cores. The time budget is checked as each fit
+    completes: once it is spent (and at least one candidate is fully scored)
+    the remaining fits are cancelled, so retraining time stays bounded as
+    feedback grows. Folds are deterministic (fixed seed), so repeated runs on
+    the same rows use the same splits without caching them.
+    """
+    def __init__(self, candidates=CANDIDATES, n_folds: int = CV_FOLDS, time_budget_s: float = TIME_BUDGET_S,
+                 max_cv_rows: int = MAX_CV_ROWS, n_jobs: int = N_JOBS):
+        self.candidates = candidates
+        self.n_folds = n_folds
+        self.time_budget_s = time_budget_s
+        self.max_cv_rows = max_cv_rows
+        self.n_jobs = n_jobs
+
+    def _splits(self, y):
+        """Returns (row sample, [(train_idx, test_idx), ...])."""
+        rng = np.random.RandomState(42)
+        sample = np.arange(len(y))
+        if len(y) > self.max_cv_rows:
+            # Stratified subsample keeps the class balance of the full data, with
+            # enough rows of each class for every fold to see it
+            sample = np.concatenate([
+                rng.choice(rows,
+                           size=min(len(rows), max(self.n_folds, int(round(self.max_cv_rows * len(rows) / len(y))))),
+                           replace=False)
+                for rows in (np.flatnonzero(y == label) for label in np.unique(y))
+            ])
+            sample.sort()
+
+        # Every class keeps at least two rows (checked in select), so k is at least 2
+        n_folds = max(2, min(self.n_folds, int(np.bincount(y[sample]).min())))
+        folds = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42).split(sample, y[sample]))
+        return sample, folds
+
+    def select(self, X, y):
+        """
+        Cross-validates the candidates and refits the best one on all rows.
+
+        Returns (model, metrics) or (None, None) when the data cannot be
+        cross-validated (e.g. fewer than two examples of a class).
+        """
+        start = time.perf_counter()
+        deadline = start + self.time_budget_s
+        X_full, y_full = X, y  # the final refit keeps DataFrame feature names
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y).astype(int)
+        if len(np.unique(y)) < 2 or np.bincount(y).min() < 2:
+            print("Model selection needs at least two examples of each class.")
+            return None, None
+
+        sample, folds = self._splits(y)
+        X_cv, y_cv = X[sample], y[sample]
+
+        n_workers = self.n_jobs if self.n_jobs > 0 else os.cpu_count() or 1
+        executor = get_reusable_executor(max_workers=n_workers)
+        # Candidates are submitted in order, so the first ones finish first
+        pending = {
+            executor.submit(_evaluate_fold, estimator, X_cv, y_cv, train_idx, test_idx): index
+            for index, (_, estimator) in enumerate(self.candidates)
+            for train_idx, test_idx in folds
+        }
+        fold_scores = {index: [] for index in range(len(self.candidates))}
+        results = {}
+        while pending:
+            # Until one candidate is fully scored there is nothing to return, so keep waiting
+            timeout = max(0.0, deadline - time.perf_counter()) if results else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                fold_scores[index].append(future.result())
+                if len(fold_scores[index]) == len(folds):
+                    name, estimator = self.candidates[index]
+                    scores = np.array(fold_scores[index])
+                    results[index] = (name, estimator, scores[:, 0].mean(), scores[:, 1].mean())
+            if pending and results and time.perf_counter() >= deadline:
+                for future in pending:
+                    future.cancel()
+                print(f"Model selection time budget reached after {len(results)} candidates.")
+                break
+
+        best_index = min(results, key=lambda index: results[index][2])
+        name, estimator, cv_log_loss, cv_accuracy = results[best_index]
+
+        model = clone(estimator)
+        model.fit(X_full, y_full)
+
+        metrics = {
+            'accuracy': round(float(cv_accuracy), 4),
+            'cv_log_loss': round(float(cv_log_loss), 4),
+            'model': name,
+            'params': {key: value for key, value in estimator.get_params().items() if key in ('C', 'alpha', 'class_weight')},
+            'folds': len(folds),
+            'cv_rows': len(sample),
+            'candidates_evaluated': len(results),
+            'train_rows': len(y),
+            'test_rows': len(folds[0][1]),
+            'seconds': round(time.perf_counter() - start, 2)
+        }
+        print(f"Model selection picked {name} {metrics['params']} "
+              f"(CV log loss {cv_log_loss:.4f}, accuracy {cv_accuracy:.2f}) in {metrics['seconds']}s.")
+        return model, metrics
@@ -1,86 +1,392 @@
 import pandas as pd
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.model_selection import train_test_split
 import numpy as np
+import copy
+import hashlib
 import os
+import threading
+import time
+import joblib
+import sklearn
+from src.feedback_store import FeedbackStore, FEEDBACK_FILE, FEEDBACK_LOG_FILE, FEEDBACK_SNAPSHOT_PREFIX
+from src.model_registry import ModelRegistry
+from src.fast_scorer import LinearScorer, SCORER_PARAMS_FILE, next_export_version
+from src.model_selection import ModelSelector
 
-FEEDBACK_FILE = "src/data/feedback_data.csv"
+try:
+    import fcntl  # Serializes warm start across gunicorn workers (POSIX only)
+except ImportError:
+    fcntl = None
+
+# Online learning (opt-in): each add_feedback nudges the model with one SGD step, and a
+# full LogisticRegression refit runs in the background every FULL_REFIT_EVERY updates
+ONLINE_LEARNING = os.environ.get("RANKER_ONLINE_LEARNING", "0") == "1"
+ONLINE_LEARNING_RATE = 0.01
+FULL_REFIT_EVERY = 500
+MIN_TRAINING_ROWS = 10
+# Trained model + training-data fingerprint, reused on startup when the data is unchanged
+MODEL_ARTIFACT_FILE = "src/data/ranker_model.joblib"
+ARTIFACT_FORMAT_VERSION = 1
+# Cross-validated selection over several linear models instead of a single 80/20 fit
+MODEL_SELECTION = os.environ.get("RANKER_MODEL_SELECTION", "0") == "1"
 
 class RankingEngine:
     """Handles training and application of a custom Scikit-learn ranker."""
     def __init__(self):
         self.model = None
+        # Versioned history of full refits; self.model is swapped as a whole reference
+        self.registry = ModelRegistry()
+        self.retrain_status = {'state': 'idle', 'started_at': None, 'finished_at': None, 'result': None}
+        self.online_model = None
+        self.online_updates = 0
+        # Registry version holding the online model since the last refit/rollback (None until its first step)
+        self._online_version = None
+        self._online_base_version = None
+        # Serializes online steps against each other and against refit/rollback publishing
+        self._online_lock = threading.Lock()
+        self._data_lock = threading.Lock()
+        self._refit_lock = threading.Lock()
+        self.selector = ModelSelector()
+        # Append-only log + columnar snapshots, compacted in the background
+        self.store = FeedbackStore(FEEDBACK_LOG_FILE, FEEDBACK_SNAPSHOT_PREFIX, seed_path=FEEDBACK_FILE)
         self.feedback_data = self._load_data()
+        self.store.start_background_compaction()
+
+    @property
+    def feedback_data(self):
+        """All feedback as a DataFrame. Rows added since the last access are merged lazily."""
+        with self._data_lock:
+            if self._new_rows:
+                self._feedback_df = pd.concat([self._feedback_df, pd.DataFrame(self._new_rows)], ignore_index=True)
+                self._new_rows = []
+            return self._feedback_df
+
+    @feedback_data.setter
+    def feedback_data(self, df):
+        with self._data_lock:
+            self._feedback_df = df
+            self._new_rows = []
+
+    def _reload_data(self):
+        """Re-reads feedback from disk without losing rows appended concurrently."""
+        with self._data_lock:
+            self._feedback_df = self._load_data()
+            self._new_rows = []
+
+    @property
+    def feedback_count(self):
+        """Number of feedback entries, without materializing pending rows."""
+        return len(self._feedback_df) + len(self._new_rows)
+
+    @property
+    def model_version(self):
+        """
+        Active registry version. The first online SGD step after a refit or
+        rollback publishes the online model as a new version; later steps
+        update that version in place.
+        """
+        return self.registry.active_version
 
     def _load_data(self):
         """Loads or initializes the feedback DataFrame."""
-        if os.path.exists(FEEDBACK_FILE):
+        if self.store.exists():
             print("Loaded historical feedback data.")
-            return pd.read_csv(FEEDBACK_FILE)
         else:
             print("No feedback data found. Initializing empty dataset.")
-            # Define columns for the feedback loop
-            return pd.DataFrame(columns=['mentor_id', 'mentee_query', 'vector_distance', 'success_rating'])
+        return self.store.load()
 
     def add_feedback(self, mentor_id, mentee_query, vector_distance, success_rating):
-        """Adds a new feedback entry to the in-memory data and saves it."""
-        new_entry = pd.DataFrame([{
+        """Appends a new feedback entry to the log; cost does not grow with history."""
+        new_entry = {
             'mentor_id': mentor_id,
             'mentee_query': mentee_query,
             'vector_distance': vector_distance,
-            'success_rating': success_rating
-        }])
+            'success_rating': success_rating,
+            # Success_rating > 3.0 is a binary 'success' (1)
+            'success': 1 if success_rating >= 4 else 0
+        }
+
+        with self._data_lock:
+            self.store.append(new_entry)
+            self._new_rows.append(new_entry)
+        print(f"Feedback added and saved. Total entries: {self.feedback_count}")
+
+        if ONLINE_LEARNING:
+            self._online_update(vector_distance, new_entry['success'])
+
+    def _online_update(self, vector_distance, success):
+        """Applies one incremental SGD step for a new feedback entry."""
+        if self.online_model is None:
+            # No model to update yet: fit one as soon as there is enough data
+            if self.feedback_count >= MIN_TRAINING_ROWS:
+                self._schedule_full_refit()
+            return
+
+        # Copy-on-write: update a private copy, then publish it with one reference swap
+        # so threads calling predict_proba never see weights mid-update. The lock keeps
+        # concurrent steps (and a refit publishing meanwhile) from overwriting each other.
+        X = pd.DataFrame([[vector_distance]], columns=['vector_distance'])
+        with self._online_lock:
+            if self.online_model is None:
+                return
+            updated = copy.deepcopy(self.online_model)
+            updated.partial_fit(X, [success])
+            self.online_updates += 1
+            metrics = {'model': 'online sgd', 'online_updates': self.online_updates, 'base_version': self._online_base_version}
+            # The online model is its own registry version; later steps update it in place
+            if self._online_version is None or not self.registry.replace(self._online_version, updated, metrics):
+                self._online_version = self.registry.publish(updated, metrics)
+            self.online_model = updated
+            self.model = updated
+            updates = self.online_updates
+            # Serve-only workers score with the exported params, so they need every step too
+            self._export_scorer(updated, self._online_version, metrics)
 
-        # Success_rating > 3.0 is a binary 'success' (1)
-        new_entry['success'] = np.where(new_entry['success_rating'] >= 4, 1, 0)
+        if updates % FULL_REFIT_EVERY == 0:
+            self._schedule_full_refit()
 
-        self.feedback_data = pd.concat([self.feedback_data, new_entry], ignore_index=True)
-        self.feedback_data.to_csv(FEEDBACK_FILE, index=False)
-        print(f"Feedback added and saved. Total entries: {len(self.feedback_data)}")
+    def _reset_online_model(self, model, version, X, y):
+        """Starts a new online model from `model` (caller holds _online_lock)."""
+        self.online_model = self._seed_online_model(model, X, y) if ONLINE_LEARNING else None
+        self.online_updates = 0
+        self._online_version = None
+        self._online_base_version = version
+
+    def retrain_async(self, model_selection: bool = None):
+        """Starts a background retrain. Returns False if one is already running."""
+        return self._schedule_full_refit(model_selection)
+
+    def _schedule_full_refit(self, model_selection: bool = None):
+        """Runs train_ranker in a background thread unless a refit is already running."""
+        if not self._refit_lock.acquire(blocking=False):
+            return False
+
+        self.retrain_status = {
+            'state': 'running',
+            'started_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'finished_at': None,
+            'result': None
+        }
+
+        def run():
+            result = 'failed'
+            try:
+                result = 'trained' if self.train_ranker(model_selection=model_selection) else 'not enough data'
+            except Exception as e:
+                print(f"Background retrain failed: {e}")
+            finally:
+                self.retrain_status = dict(
+                    self.retrain_status,
+                    state='idle',
+                    finished_at=time.strftime('%Y-%m-%d %H:%M:%S'),
+                    result=result
+                )
+                self._refit_lock.release()
+
+        threading.Thread(target=run, name="ranker-refit", daemon=True).start()
+        return True
+
+    def rollback(self, version: int):
+        """Re-activates an earlier model version. Returns True on success."""
+        data = self.feedback_data
+        with self._online_lock:
+            model = self.registry.rollback(version)
+            if model is None:
+                return False
+            self._reset_online_model(model, version, data[['vector_distance']], data['success'])
+            self.model = model
+        self._export_scorer(model, version, {})
+        print(f"Rolled back ranker to version {version}.")
+        return True
 
-    def train_ranker(self):
-        """Trains a Logistic Regression model to predict match success."""
+    def _seed_online_model(self, model, X, y):
+        """Creates an SGD model that starts from the fitted LogisticRegression weights."""
+        online_model = SGDClassifier(
+            loss='log_loss',
+            learning_rate='constant',
+            eta0=ONLINE_LEARNING_RATE,
+            random_state=42
+        )
+        # One partial_fit call sets up classes and feature names; weights are then replaced
+        online_model.partial_fit(X.iloc[:1], y.iloc[:1], classes=np.array([0, 1]))
+        online_model.coef_ = model.coef_.copy()
+        online_model.intercept_ = model.intercept_.copy()
+        return online_model
+
+    def load_or_train(self):
+        """
+        Warm start: loads the saved model if it was trained on exactly the current
+        feedback data, otherwise retrains (and saves) it.
+
+        A file lock makes concurrent workers wait for the first one's fit and
+        then load its artifact instead of repeating the same training.
+        """
+        lock_file = open(MODEL_ARTIFACT_FILE + ".lock", 'w')
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            self._reload_data()
+            data = self.feedback_data
+            artifact = self._load_artifact()
+            if artifact is not None and artifact['fingerprint'] == self._data_fingerprint(data):
+                self._activate_artifact(artifact, data)
+                return True
+
+            print("No saved ranker for the current feedback data; training a new one.")
+            return self.train_ranker(reload=False)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _data_fingerprint(self, data):
+        """Order-sensitive content hash of the training columns."""
+        hashes = pd.util.hash_pandas_object(data[['vector_distance', 'success']], index=False)
+        return hashlib.sha256(hashes.values.tobytes()).hexdigest()
+
+    def _load_artifact(self):
+        """Reads the saved model artifact, or None if missing, unreadable or incompatible."""
+        if not os.path.exists(MODEL_ARTIFACT_FILE):
+            return None
+        try:
+            artifact = joblib.load(MODEL_ARTIFACT_FILE)
+        except Exception as e:
+            print(f"Could not read saved ranker: {e}")
+            return None
+        if artifact.get('format_version') != ARTIFACT_FORMAT_VERSION or \
+                artifact.get('sklearn_version') != sklearn.__version__:
+            print("Saved ranker was written by a different format or scikit-learn version; ignoring it.")
+            return None
+        return artifact
+
+    def _save_artifact(self, model, fingerprint, metrics):
+        """Writes the model with its data fingerprint and metadata via an atomic rename."""
+        artifact = {
+            'format_version': ARTIFACT_FORMAT_VERSION,
+            'sklearn_version': sklearn.__version__,
+            'model': model,
+            'fingerprint': fingerprint,
+            'metrics': metrics,
+            'trained_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        tmp_path = MODEL_ARTIFACT_FILE + ".tmp"
+        joblib.dump(artifact, tmp_path)
+        os.replace(tmp_path, MODEL_ARTIFACT_FILE)
+
+    def _activate_artifact(self, artifact, data):
+        model = artifact['model']
+        with self._online_lock:
+            version = self.registry.publish(model, artifact['metrics'])
+            self._reset_online_model(model, version, data[['vector_distance']], data['success'])
+            self.model = model
+        self._export_scorer(model, version, artifact['metrics'], artifact['fingerprint'], len(data))
+        print(f"Loaded saved ranker (trained {artifact['trained_at']}) as version {version}.")
+
+    def train_ranker(self, reload: bool = True, model_selection: bool = None):
+        """
+        Trains a Logistic Regression model to predict match success.
+
+        With model_selection (default: RANKER_MODEL_SELECTION) the model is
+        chosen by parallel k-fold cross-validation instead of one 80/20 split.
+        """
+        if model_selection is None:
+            model_selection = MODEL_SELECTION
 
         # --- FIX: Force a reload of the saved data before checking the count ---
-        self.feedback_data = self._load_data()
+        if reload:
+            self._reload_data()
         # ---------------------------------------------------------------------
 
-        if len(self.feedback_data) < 10:
+        # Take one consistent view of the data; new feedback may arrive meanwhile
+        data = self.feedback_data
+        if len(data) < MIN_TRAINING_ROWS:
             print("Not enough feedback data (need min 10) to train the ranker.")
             return False
 
         # Target variable: success (1 or 0)
-        X = self.feedback_data[['vector_distance']]
-        y = self.feedback_data['success']
+        X = data[['vector_distance']]
+        y = data['success']
+        fingerprint = self._data_fingerprint(data)
+
+        model = None
+        if model_selection:
+            model, metrics = self.selector.select(X, y)
+            if model is not None:
+                # The winner is refit on every row; the drift check uses all of them too
+                X_train, X_test, y_train, y_test = X, X, y, y
+                score = metrics['accuracy']
+
+        if model is None:
+            # Splitting data (simple for this example)
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+            # Use a simple classifier (Logistic Regression) as the ranker
+            model = LogisticRegression()
+            model.fit(X_train, y_train)
 
-        # Splitting data (simple for this example)
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+            score = model.score(X_test, y_test)
+            print(f"Ranking Model Trained! Accuracy on test set: {score:.2f}")
+            metrics = {
+                'accuracy': round(float(score), 4),
+                'train_rows': len(X_train),
+                'test_rows': len(X_test)
+            }
 
-        # Use a simple classifier (Logistic Regression) as the ranker
-        self.model = LogisticRegression()
-        self.model.fit(X_train, y_train)
+        online_model = self.online_model
+        if ONLINE_LEARNING and online_model is not None:
+            # Correctness check: how far has the online model drifted from a full refit?
+            online_score = online_model.score(X_test, y_test)
+            prob_gap = np.abs(
+                online_model.predict_proba(X_test)[:, 1] - model.predict_proba(X_test)[:, 1]
+            ).max()
+            print(f"Online model check: accuracy {online_score:.2f} vs refit {score:.2f}, max probability gap {prob_gap:.3f}")
 
-        score = self.model.score(X_test, y_test)
-        print(f"Ranking Model Trained! Accuracy on test set: {score:.2f}")
+        # Publish atomically: the new model replaces the old one in a single assignment
+        with self._online_lock:
+            version = self.registry.publish(model, metrics)
+            self._reset_online_model(model, version, X_train, y_train)
+            self.model = model
+        print(f"Published ranker version {version}.")
+
+        # Persist for instant warm start by later processes
+        try:
+            self._save_artifact(model, fingerprint, metrics)
+        except Exception as e:
+            print(f"Could not save ranker artifact: {e}")
+        self._export_scorer(model, version, metrics, fingerprint, len(data))
         return True
 
+    def _export_scorer(self, model, version, metrics, fingerprint=None, feedback_rows=None):
+        """Writes the active model as a tiny parameter file for serve-only workers."""
+        try:
+            LinearScorer.from_model(model).save(SCORER_PARAMS_FILE, {
+                'export_version': next_export_version(SCORER_PARAMS_FILE),
+                'version': version,
+                'metrics': metrics,
+                'fingerprint': fingerprint,
+                'feedback_rows': self.feedback_count if feedback_rows is None else feedback_rows
+            })
+        except Exception as e:
+            print(f"Could not export ranker params: {e}")
+
     def apply_ranking(self, matches):
         """Applies the trained ranker to re-sort the initial matches."""
-        if self.model is None:
+        # Read the model reference once; a background retrain may swap it
+        model = self.model
+        if model is None:
             print("Ranker is not trained or data is insufficient. Returning initial matches.")
             return matches
 
-        # Create a DataFrame from the initial matches
-        df = pd.DataFrame(matches)
-
-        # Get the new ranking score (probability of success)
-        # We only use 'vector_distance' as the feature for simplicity
-        ranking_scores = self.model.predict_proba(df[['vector_distance']])[:, 1]
-
-        df['ranking_score'] = ranking_scores
+        # NumPy fast path; benchmarks/ranking_fast_path.py checks parity with the original pandas version
+        return LinearScorer.from_model(model).rank_by_success(matches)
 
-        # Sort by the new score (highest probability of success first)
-        df_ranked = df.sort_values(by='ranking_score', ascending=False)
+    def score_matches(self, matches, distance_weight: float = 1.0, success_weight: float = 1.0):
+        """Scores matches with the ranker and admin weights; returns them best first."""
+        return LinearScorer.from_model(self.model).score_matches(matches, distance_weight, success_weight)
 
-        # Convert back to a list of dictionaries
-        return df_ranked.to_dict('records')
+    @property
+    def scorer(self):
+        """LinearScorer for the active model, for vectorized scoring of many matches."""
+        return LinearScorer.from_model(self.model)
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+
+# --- Configuration ---
+# Background refresh of every student's best match and study plan for /session_analysis.
+# Off by default: without it entries are computed on the first request per student.
+SESSION_PRECOMPUTE = os.environ.get("SESSION_PRECOMPUTE", "0") == "1"
+PRECOMPUTE_INTERVAL_S = float(os.environ.get("SESSION_PRECOMPUTE_INTERVAL_S", "30"))
+N_CANDIDATES = 3
+# Weights used to pick the mentor whose plan is generated ahead of time
+DEFAULT_WEIGHTS = (1.0, 1.0)
+
+def mentee_query(student: dict) -> str:
+    """Builds the matcher query for a student profile."""
+    return f"I need a mentor for my weaknesses: {student['weakness_areas']}. My goal is to {student['goal']}."
+
+def profile_hash(student: dict) -> str:
+    return hashlib.sha1(json.dumps(student, sort_keys=True).encode('utf-8')).hexdigest()
+
+def mentor_hash(match: dict) -> str:
+    """Hash of the mentor fields a plan is written from (not the per-query scores)."""
+    fields = {key: match.get(key) for key in ('name', 'expertise', 'description')}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()
+
+class SessionPrecomputer:
+    """
+    Keeps a precomputed match + study plan per student for /session_analysis.
+
+    Each entry is tagged with the student's profile hash, the matcher's index
+    version and the ranker's model version. A background thread recomputes
+    entries whose tags no longer match, so a request can serve the stored
+    result immediately. The stored candidates are re-scored with the caller's
+    weights on every request (microseconds); only a plan for a mentor that
+    was not precomputed is generated on the request path.
+    """
+    def __init__(self, matcher, ranker, advisor, students, interval_s: float = PRECOMPUTE_INTERVAL_S):
+        self.matcher = matcher
+        self.ranker = ranker
+        self.advisor = advisor
+        self.students = students  # JsonFileCache of {id: profile}
+        self.interval_s = interval_s
+        self._entries = {}
+        self._plans = {}  # (profile hash, mentor id) -> (mentor hash, plan)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._entries_version = 0  # bumped whenever an entry is stored or dropped
+        self._arrays = None  # candidate matrices for preview_weights, per _entries_version
+        self._proba = None  # success probabilities for those matrices, per ranker coefficients
+
+    def _signature(self, student: dict):
+        return (profile_hash(student), self.matcher.index_version, self.ranker.model_version)
+
+    def compute(self, student: dict):
+        """Runs the full pipeline for one student and stores the result."""
+        signature = self._signature(student)
+        matches = self.matcher.find_matches(mentee_query(student), n_results=N_CANDIDATES)
+        return self._store(student, signature, matches)
+
+    def _store(self, student: dict, signature: tuple, matches: list):
+        """Makes sure the best mentor's plan exists and publishes the entry."""
+        if matches:
+            self.plan_for(student, self.ranker.score_matches(matches, *DEFAULT_WEIGHTS)[0])
+
+        entry = {'signature': signature, 'matches': matches, 'computed_at': time.time()}
+        with self._lock:
+            self._entries[student['id']] = entry
+            self._entries_version += 1
+        return entry
+
+    def get(self, student: dict):
+        """Returns (entry, is_fresh), or (None, False) if the student was never computed."""
+        with self._lock:
+            entry = self._entries.get(student['id'])
+        if entry is None:
+            return None, False
+        is_fresh = entry['signature'] == self._signature(student)
+        if not is_fresh:
+            self._wake.set()
+        return entry, is_fresh
+
+    def plan_for(self, student: dict, match: dict) -> str:
+        """Returns the stored plan for this student and mentor, generating and storing it if needed."""
+        key = (profile_hash(student), match['id'])
+        current = mentor_hash(match)
+        with self._lock:
+            stored = self._plans.get(key)
+        if stored is not None and stored[0] == current:
+            return stored[1]
+        plan = self.advisor.analyze_weakness_and_suggest_plan(student, match)
+        with self._lock:
+            self._plans[key] = (current, plan)
+        return plan
+
+    def refresh(self):
+        """Recomputes every stale or missing entry. Returns the number recomputed."""
+        students = self.students.get()
+        stale = []
+        for student in list(students.values()):
+            with self._lock:
+                entry = self._entries.get(student['id'])
+            signature = self._signature(student)
+            if entry is None or entry['signature'] != signature:
+                stale.append((student, signature))
+
+        recomputed = 0
+        if stale:
+            # One batched encode + index query for every stale student
+            try:
+                all_matches = self.matcher.find_matches_batch(
+                    [mentee_query(student) for student, _ in stale], n_results=N_CANDIDATES)
+            except Exception as e:
+                print(f"Precompute matching failed: {e}")
+                all_matches = []
+            for (student, signature), matches in zip(stale, all_matches):
+                try:
+                    self._store(student, signature, matches)
+                    recomputed += 1
+                except Exception as e:
+                    print(f"Precompute failed for student {student.get('id')}: {e}")
+
+        # Drop students that left the data file, and plans for profiles that no longer exist
+        current_hashes = {profile_hash(student) for student in students.values()}
+        with self._lock:
+            for student_id in set(self._entries) - set(students):
+                del self._entries[student_id]
+                self._entries_version += 1
+            for key in [key for key in self._plans if key[0] not in current_hashes]:
+                del self._plans[key]
+        return recomputed
+
+    def _candidate_arrays(self):
+        """
+        Stored candidates as (version, (student_ids, mentor_ids, names, distances, valid)).
+
+        Rows are students, columns are candidates in matcher order; short
+        candidate lists are padded and masked out by `valid`. Rebuilt only
+        when an entry changes.
+        """
+        with self._lock:
+            version = self._entries_version
+            if self._arrays is not None and self._arrays[0] == version:
+                return self._arrays
+            entries = list(self._entries.items())
+
+        n_cols = max([len(entry['matches']) for _, entry in entries] + [1])
+        student_ids = [student_id for student_id, _ in entries]
+        mentor_ids = np.full((len(entries), n_cols), '', dtype=object)
+        names = np.full((len(entries), n_cols), '', dtype=object)
+        distances = np.zeros((len(entries), n_cols))
+        valid = np.zeros((len(entries), n_cols), dtype=bool)
+        for row, (_, entry) in enumerate(entries):
+            for col, match in enumerate(entry['matches']):
+                mentor_ids[row, col] = match['id']
+                names[row, col] = match['name']
+                distances[row, col] = match['vector_distance']
+                valid[row, col] = True
+
+        self._arrays = (version, (student_ids, mentor_ids, names, distances, valid))
+        return self._arrays
+
+    def preview_weights(self, current: tuple, proposed: tuple):
+        """
+        Cohort-wide what-if: each student's top mentor under the current and
+        the proposed (distance_weight, success_weight), in one NumPy pass.
+
+        Uses the same final_score formula and tie order as score_matches.
+        Success probabilities are cached until the candidates or the ranker
+        coefficients change.
+        """
+        start = time.perf_counter()
+        version, (student_ids, mentor_ids, names, distances, valid) = self._candidate_arrays()
+
+        scorer = self.ranker.scorer
+        proba_key = (version, scorer.coef, scorer.intercept)
+        if self._proba is None or self._proba[0] != proba_key:
+            self._proba = (proba_key, scorer.success_proba(distances.ravel()).reshape(distances.shape))
+        success = self._proba[1]
+
+        def top_candidates(weights):
+            final = (1.0 - distances) * weights[0] + success * weights[1]
+            final = np.where(valid, final, -np.inf)
+            # argmax keeps the first maximum, like the stable sort in score_matches
+            top = final.argmax(axis=1)
+            return top, final[np.arange(len(top)), top]
+
+        current_top, current_score = top_candidates(current)
+        proposed_top, proposed_score = top_candidates(proposed)
+        has_match = valid.any(axis=1)
+        changed = np.flatnonzero(has_match & (current_top != proposed_top))
+
+        return {
+            'students': int(has_match.sum()),
+            # Current students without an entry yet (removed students may still have one)
+            'pending': len(set(self.students.get()) - set(student_ids)),
+            'changed_count': len(changed),
+            'changed': [
+                {
+                    'student_id': student_ids[i],
+                    'current_mentor': names[i, current_top[i]],
+                    'current_mentor_id': mentor_ids[i, current_top[i]],
+                    'current_score': round(float(current_score[i]), 4),
+                    'proposed_mentor': names[i, proposed_top[i]],
+                    'proposed_mentor_id': mentor_ids[i, proposed_top[i]],
+                    'proposed_score': round(float(proposed_score[i]), 4)
+                }
+                for i in changed
+            ],
+            'seconds': round(time.perf_counter() - start, 4)
+        }
+
+    def wake(self):
+        """Asks the background thread to refresh now instead of at the next interval."""
+        self._wake.set()
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        def run():
+            while True:
+                self._wake.clear()
+                start = time.perf_counter()
+                recomputed = self.refresh()
+                if recomputed:
+                    print(f"Precomputed session analysis for {recomputed} students in {time.perf_counter() - start:.1f}s.")
+                self._wake.wait(self.interval_s)
+
+        self._thread = threading.Thread(target=run, name="session-precompute", daemon=True)
+        self._thread.start()
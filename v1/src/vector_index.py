@@ -0,0 +1,600 @@
+import json
+import os
+import threading
+import numpy as np
+
+# --- Configuration ---
+# Matrix files are named per generation (e.g. embeddings.3.npy); these are the
+# names used by indexes written before generations existed
+EMBEDDINGS_FILE = "embeddings.npy"
+SCALES_FILE = "scales.npy"
+FULL_EMBEDDINGS_FILE = "embeddings_f32.npy"
+METADATA_FILE = "metadata.json"
+# Single-mentor changes since the last rewrite, one JSON line each
+LOG_FILE = "changes.log.jsonl"
+# Rewrite (compact) once the log holds this many records or dead rows outnumber live ones
+COMPACT_EVERY = 1000
+# Rows preallocated in the matrix files: at least this many, or twice the live rows
+MIN_CAPACITY = 1024
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+# Quantized rows are converted to float32 and scored in chunks small enough to stay in cache
+SCORE_CHUNK_ROWS = 512
+# Chroma-style metadata filter operators supported by `where`
+COMPARISONS = {
+    "$eq": lambda column, value: column == value,
+    "$ne": lambda column, value: column != value,
+    "$gt": lambda column, value: column > value,
+    "$gte": lambda column, value: column >= value,
+    "$lt": lambda column, value: column < value,
+    "$lte": lambda column, value: column <= value,
+}
+
+class NumpyVectorIndex:
+    """
+    In-process brute-force vector index for small and medium mentor pools.
+
+    Mentor embeddings live in one contiguous matrix file, preallocated with
+    spare rows and memory-mapped. A query is a single matrix-vector product
+    followed by argpartition for the top k.
+
+    Adding, approving or removing a mentor costs O(1) I/O: the new row is
+    written into the spare capacity of the memory-mapped files and one line
+    is appended to a change log (the replaced row is marked dead). Loading
+    replays the log over the last full write. The index is rewritten as a
+    new generation (packed, dead rows dropped, capacity doubled) only when
+    the log reaches COMPACT_EVERY records, dead rows outnumber live ones,
+    capacity runs out, or a batch touches half the index.
+
+    The scoring matrix can be stored as float32, float16 or int8. int8 uses
+    symmetric per-row scalar quantization (one float32 scale per mentor);
+    it is scored by upcasting the codes chunk by chunk and applying the scale
+    to the dot products, not to the rows. float16 has no fast upcast in NumPy
+    and is several times slower to scan than float32 (see
+    benchmarks/quantization.py), so it only trades latency for memory.
+    With `rerank_candidates` > 0 a full-precision copy is also kept on disk
+    (memory-mapped, so only the rows that get re-ranked are paged in) and the
+    top candidates are re-scored exactly before the final top k is returned.
+    The matrices are only ever held as memory maps, so a process that built
+    the index holds no more in RAM than one that loaded it.
+
+    Upserts, deletes, compaction and queries all hold one re-entrant lock:
+    request threads query while admin routes change mentors, and a query
+    must never see a rewrite's arrays half swapped.
+
+    The class mirrors the subset of the Chroma collection API used by
+    AIMatcher (count, upsert, delete, get, query, including Chroma's `where` metadata
+    filters) so either backend can be plugged in. Filters are evaluated as a
+    boolean mask over cached metadata columns before scoring, so only the
+    matching rows are scored.
+    Distances are squared L2, matching Chroma's default "l2" space, so
+    `vector_distance` values stay comparable between backends.
+    """
+    def __init__(self, path: str, dtype: str = "float32", rerank_candidates: int = 0):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported index dtype: {dtype}")
+        self.path = path
+        self.dtype = dtype
+        # A float32 index is already exact, so there is nothing to re-rank
+        self.rerank_candidates = rerank_candidates if dtype != "float32" else 0
+
+        # Per row, including rows replaced or deleted since the last rewrite
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+        self.embeddings = None       # scoring matrix in self.dtype (capacity rows)
+        self.scales = None           # per-row scales (int8 only)
+        self.full_embeddings = None  # float32 copy for re-ranking (optional)
+        self._sq_norms = np.empty(0, dtype=np.float32)
+        self._live = np.empty(0, dtype=bool)  # False for replaced/deleted rows
+        self._positions = {}         # id -> row of its live version
+        self._columns = {}           # metadata field -> array, for filtering
+        self._files = {}             # matrix name -> file of the current generation
+        self._generation = 0
+        self._log_records = 0
+        # Request threads query while admin routes upsert/delete and compaction swaps
+        # the matrices; every public method holds this so no reader sees a half update
+        self._lock = threading.RLock()
+        self._load()
+
+    # --- Persistence ---
+
+    def _load(self):
+        """Memory-maps a previously saved index, if there is one, and replays its change log."""
+        meta_path = os.path.join(self.path, METADATA_FILE)
+        if not os.path.exists(meta_path):
+            return
+
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+
+        stored_dtype = meta.get('dtype', 'float32')
+        stored_full = meta.get('has_full_embeddings', False)
+        if stored_dtype != self.dtype or (self.rerank_candidates and not stored_full):
+            print(f"Stored index layout ({stored_dtype}) does not match the configured one ({self.dtype}). "
+                  "It will be replaced by the next index_mentors run.")
+            return
+
+        self._generation = meta.get('generation', 0)
+        self._files = meta.get('files') or {
+            'embeddings': EMBEDDINGS_FILE,
+            'scales': SCALES_FILE,
+            'full_embeddings': FULL_EMBEDDINGS_FILE
+        }
+        self.ids = meta['ids']
+        self.documents = meta['documents']
+        self.metadatas = meta['metadatas']
+        self._open_matrices()
+        self._live = np.zeros(len(self.embeddings), dtype=bool)
+        self._live[:len(self.ids)] = True
+        self._positions = {mentor_id: i for i, mentor_id in enumerate(self.ids)}
+        self._replay_log()
+        self._sq_norms = self._row_sq_norms()
+        self._columns = {}
+
+    def _open_matrices(self):
+        """Memory-maps the current generation's matrices for reading and in-place row writes."""
+        def open_file(name):
+            return np.load(os.path.join(self.path, self._files[name]), mmap_mode='r+')
+
+        self.embeddings = open_file('embeddings')
+        self.scales = open_file('scales') if self.dtype == "int8" else None
+        self.full_embeddings = open_file('full_embeddings') if self.rerank_candidates else None
+
+    def _replay_log(self):
+        """Applies the change-log records of the current generation."""
+        log_path = os.path.join(self.path, LOG_FILE)
+        self._log_records = 0
+        if not os.path.exists(log_path):
+            return
+
+        valid_bytes = 0
+        with open(log_path, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("incomplete line")
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-append: cut it so new appends start clean
+                    print(f"Truncating torn record at byte {valid_bytes} of {log_path}.")
+                    f.close()
+                    os.truncate(log_path, valid_bytes)
+                    break
+                valid_bytes += len(line)
+                # Records from before the last rewrite (crash before the log was reset) are already in it
+                if entry['generation'] == self._generation:
+                    self._apply(entry)
+                    self._log_records += 1
+
+    def _apply(self, entry):
+        """Applies one change-log record to the in-memory row bookkeeping."""
+        if entry['op'] == 'delete':
+            row = self._positions.pop(entry['id'], None)
+            if row is not None:
+                self._live[row] = False
+            return
+
+        previous = self._positions.get(entry['id'])
+        if previous is not None:
+            self._live[previous] = False
+        self._positions[entry['id']] = entry['row']
+        self._live[entry['row']] = True
+        self.ids.append(entry['id'])
+        self.documents.append(entry['document'])
+        self.metadatas.append(entry['metadata'])
+
+    def _append_log(self, entries):
+        with open(os.path.join(self.path, LOG_FILE), 'a') as f:
+            f.writelines(json.dumps(entry) + '\n' for entry in entries)
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_records += len(entries)
+
+    def _rewrite(self, ids, documents, metadatas, codes, scales, full, sq_norms):
+        """
+        Writes packed rows as a new generation (matrices preallocated with
+        spare capacity), commits it by renaming the metadata into place, then
+        resets the change log and removes the previous generation's files.
+        """
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            generation = self._generation + 1
+            capacity = max(MIN_CAPACITY, 2 * len(ids))
+
+            arrays = {'embeddings': codes}
+            if scales is not None:
+                arrays['scales'] = scales
+            if full is not None:
+                arrays['full_embeddings'] = full
+
+            files = {}
+            for name, array in arrays.items():
+                files[name] = f"{name}.{generation}.npy"
+                out = np.lib.format.open_memmap(
+                    os.path.join(self.path, files[name]), mode='w+',
+                    dtype=array.dtype, shape=(capacity,) + array.shape[1:]
+                )
+                out[:len(array)] = array
+                out.flush()
+                del out
+
+            meta_path = os.path.join(self.path, METADATA_FILE)
+            with open(meta_path + ".tmp", 'w') as f:
+                json.dump({
+                    'dtype': self.dtype,
+                    'has_full_embeddings': full is not None,
+                    'generation': generation,
+                    'files': files,
+                    'ids': ids,
+                    'documents': documents,
+                    'metadatas': metadatas
+                }, f)
+                f.flush()
+                os.fsync(f.fileno())
+            # The metadata rename is the commit point: until then readers see the previous generation
+            os.replace(meta_path + ".tmp", meta_path)
+            log_path = os.path.join(self.path, LOG_FILE)
+            if os.path.exists(log_path):
+                os.truncate(log_path, 0)
+
+            old_files = [name for name in self._files.values() if name not in files.values()]
+            self._generation, self._files, self._log_records = generation, files, 0
+            self.ids, self.documents, self.metadatas = list(ids), list(documents), list(metadatas)
+            self._open_matrices()
+            for name in old_files:
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    pass
+
+            self._live = np.zeros(capacity, dtype=bool)
+            self._live[:len(ids)] = True
+            self._sq_norms = np.zeros(capacity, dtype=np.float32)
+            self._sq_norms[:len(ids)] = sq_norms
+            self._positions = {mentor_id: i for i, mentor_id in enumerate(self.ids)}
+            self._columns = {}
+
+    def _packed(self):
+        """Live rows in row order: (ids, documents, metadatas, codes, scales, full, sq_norms)."""
+        rows = np.array(sorted(self._positions.values()), dtype=np.int64)
+        return (
+            [self.ids[i] for i in rows],
+            [self.documents[i] for i in rows],
+            [self.metadatas[i] for i in rows],
+            np.asarray(self.embeddings[rows]),
+            np.asarray(self.scales[rows]) if self.scales is not None else None,
+            np.asarray(self.full_embeddings[rows]) if self.full_embeddings is not None else None,
+            self._sq_norms[rows]
+        )
+
+    def compact(self):
+        """Folds the change log into a new generation, dropping replaced and deleted rows."""
+        with self._lock:
+            if self.embeddings is not None:
+                self._rewrite(*self._packed())
+
+    def _maybe_compact(self):
+        dead_rows = len(self.ids) - len(self._positions)
+        if self._log_records >= COMPACT_EVERY or dead_rows > len(self._positions):
+            self.compact()
+
+    # --- Quantization ---
+
+    def _quantize(self, vectors):
+        """Converts float32 rows to the storage dtype. Returns (codes, scales)."""
+        if self.dtype == "float16":
+            return vectors.astype(np.float16), None
+        if self.dtype == "int8":
+            scales = np.abs(vectors).max(axis=1).astype(np.float32) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.clip(np.rint(vectors / scales[:, np.newaxis]), -127, 127).astype(np.int8)
+            return codes, scales
+        return vectors, None
+
+    def _dequantize(self, start, stop):
+        """Returns rows [start, stop) of the scoring matrix as float32."""
+        rows = np.asarray(self.embeddings[start:stop], dtype=np.float32)
+        if self.scales is not None:
+            rows = rows * self.scales[start:stop, np.newaxis]
+        return rows
+
+    def _row_sq_norms(self):
+        norms = np.zeros(len(self.embeddings), dtype=np.float32)
+        for start in range(0, len(self.ids), SCORE_CHUNK_ROWS):
+            rows = self._dequantize(start, min(start + SCORE_CHUNK_ROWS, len(self.ids)))
+            norms[start:start + len(rows)] = np.einsum('ij,ij->i', rows, rows)
+        return norms
+
+    def memory_bytes(self):
+        """Bytes held by the used rows of the scoring matrix (plus scales), excluding the re-rank copy."""
+        if self.embeddings is None:
+            return 0
+        total = self.embeddings[:len(self.ids)].nbytes
+        if self.scales is not None:
+            total += self.scales[:len(self.ids)].nbytes
+        return total
+
+    def heap_bytes(self):
+        """Bytes of index arrays held on the heap rather than memory-mapped from disk."""
+        arrays = [self.embeddings, self.scales, self.full_embeddings, self._sq_norms, self._live]
+        return sum(a.nbytes for a in arrays if a is not None and not isinstance(a, np.memmap))
+
+    # --- Collection API ---
+
+    def count(self):
+        with self._lock:
+            return len(self._positions)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        """
+        Adds new vectors and overwrites existing ones (vector, document and metadata) with the same id.
+
+        A small batch writes only its own rows, into spare capacity of the
+        memory-mapped matrices, plus one change-log line per row; the
+        replaced rows are dropped at the next compaction. Batches that touch
+        half the index or more (e.g. index_mentors) rewrite it instead.
+        """
+        new_vectors = np.asarray(embeddings, dtype=np.float32)
+        documents = documents or [None] * len(ids)
+        # Like Chroma, a None value removes the key (the rest of the dict replaces the stored one)
+        metadatas = [{k: v for k, v in m.items() if v is not None} for m in metadatas] if metadatas else [{} for _ in ids]
+        new_codes, new_scales = self._quantize(new_vectors)
+
+        # Norms of the rows as stored (after quantization), so distances stay consistent
+        stored = new_codes.astype(np.float32)
+        if new_scales is not None:
+            stored *= new_scales[:, np.newaxis]
+        new_sq_norms = np.einsum('ij,ij->i', stored, stored)
+
+        with self._lock:
+            first_row = len(self.ids)
+            if (self.embeddings is None or 2 * len(ids) >= self.count()
+                    or first_row + len(ids) > len(self.embeddings)):
+                return self._upsert_rewrite(ids, new_vectors, documents, metadatas, new_codes, new_scales, new_sq_norms)
+
+            # Rows first (flushed), then the log line that makes them visible on the next load
+            rows = np.arange(first_row, first_row + len(ids))
+            self.embeddings[rows] = new_codes
+            self.embeddings.flush()
+            if self.scales is not None:
+                self.scales[rows] = new_scales
+                self.scales.flush()
+            if self.full_embeddings is not None:
+                self.full_embeddings[rows] = new_vectors
+                self.full_embeddings.flush()
+
+            entries = [
+                {'generation': self._generation, 'op': 'upsert', 'row': int(row),
+                 'id': mentor_id, 'document': document, 'metadata': metadata}
+                for row, mentor_id, document, metadata in zip(rows, ids, documents, metadatas)
+            ]
+            self._append_log(entries)
+            # Norms before _apply makes the rows live, so they are never scored with stale norms
+            self._sq_norms[rows] = new_sq_norms
+            for entry in entries:
+                self._apply(entry)
+            self._columns = {}
+            self._maybe_compact()
+
+    def _upsert_rewrite(self, ids, new_vectors, documents, metadatas, new_codes, new_scales, new_sq_norms):
+        """Merges a large batch into the live rows and writes everything as a new generation."""
+        if self.embeddings is None:
+            all_ids, all_documents, all_metadatas = [], [], []
+            codes = new_codes[:0]
+            scales = new_scales[:0] if new_scales is not None else None
+            full = new_vectors[:0] if self.rerank_candidates else None
+            sq_norms = new_sq_norms[:0]
+        else:
+            all_ids, all_documents, all_metadatas, codes, scales, full, sq_norms = self._packed()
+
+        positions = {mentor_id: i for i, mentor_id in enumerate(all_ids)}
+        appended = []
+        for row, mentor_id in enumerate(ids):
+            if mentor_id in positions:
+                i = positions[mentor_id]
+                codes[i] = new_codes[row]
+                sq_norms[i] = new_sq_norms[row]
+                if scales is not None:
+                    scales[i] = new_scales[row]
+                if full is not None:
+                    full[i] = new_vectors[row]
+                all_documents[i] = documents[row]
+                all_metadatas[i] = metadatas[row]
+            else:
+                positions[mentor_id] = len(all_ids)
+                all_ids.append(mentor_id)
+                all_documents.append(documents[row])
+                all_metadatas.append(metadatas[row])
+                appended.append(row)
+
+        if appended:
+            codes = np.concatenate([codes, new_codes[appended]])
+            sq_norms = np.concatenate([sq_norms, new_sq_norms[appended]])
+            if scales is not None:
+                scales = np.concatenate([scales, new_scales[appended]])
+            if full is not None:
+                full = np.concatenate([full, new_vectors[appended]])
+
+        self._rewrite(all_ids, all_documents, all_metadatas, codes, scales, full, sq_norms)
+
+    def delete(self, ids):
+        """Removes the rows with the given ids (one change-log line each). Unknown ids are ignored."""
+        with self._lock:
+            entries = [
+                {'generation': self._generation, 'op': 'delete', 'id': mentor_id}
+                for mentor_id in dict.fromkeys(ids) if mentor_id in self._positions
+            ]
+            if not entries:
+                return
+            self._append_log(entries)
+            for entry in entries:
+                self._apply(entry)
+            self._columns = {}
+            self._maybe_compact()
+
+    def get(self, ids=None, where=None, include=('metadatas', 'documents')):
+        """Fetches stored rows by id and/or filter in Chroma's flat layout. Unknown ids are skipped."""
+        with self._lock:
+            if ids is None:
+                positions = sorted(self._positions.values())
+            else:
+                positions = [self._positions[mentor_id] for mentor_id in ids if mentor_id in self._positions]
+            if where:
+                mask = self._where_mask(where)
+                positions = [i for i in positions if mask[i]]
+
+            result = {'ids': [self.ids[i] for i in positions]}
+            if 'metadatas' in include:
+                result['metadatas'] = [self.metadatas[i] for i in positions]
+            if 'documents' in include:
+                result['documents'] = [self.documents[i] for i in positions]
+            if 'embeddings' in include:
+                if self.full_embeddings is not None:
+                    result['embeddings'] = np.asarray(self.full_embeddings[positions], dtype=np.float32)
+                elif positions:
+                    rows = np.asarray(self.embeddings[positions], dtype=np.float32)
+                    if self.scales is not None:
+                        rows = rows * self.scales[positions, np.newaxis]
+                    result['embeddings'] = rows
+                else:
+                    result['embeddings'] = np.empty((0, 0), dtype=np.float32)
+            return result
+
+    def query(self, query_embeddings, n_results=5, where=None, include=('metadatas', 'distances')):
+        """Returns the n_results nearest vectors per query in Chroma's result layout."""
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[np.newaxis, :]
+
+        with self._lock:
+            # Restrict scoring to the live rows that pass the metadata filter
+            live = self._live[:len(self.ids)]
+            positions = np.flatnonzero(self._where_mask(where) & live) if where else None
+            n_rows = self.count() if positions is None else len(positions)
+
+            results = {'ids': [], 'distances': [], 'metadatas': [], 'documents': []}
+            if not n_rows:
+                for _ in range(len(queries)):
+                    for key in results:
+                        results[key].append([])
+                return {key: value for key, value in results.items() if key == 'ids' or key in include}
+
+            k = min(n_results, n_rows)
+            n_candidates = min(max(k, self.rerank_candidates), n_rows)
+            distances = self._distances(queries, positions)
+            if positions is None and n_rows < len(live):
+                # Replaced/deleted rows awaiting compaction are scanned but never returned
+                distances[:, ~live] = np.inf
+
+            for query, row in zip(queries, distances):
+                top = self._top_k(row, n_candidates)
+                top_distances = row[top]
+                if positions is not None:
+                    top = positions[top]
+
+                if self.full_embeddings is not None:
+                    # Exact re-rank of the candidates against the full-precision rows
+                    diffs = np.asarray(self.full_embeddings[top], dtype=np.float32) - query
+                    top_distances = np.einsum('ij,ij->i', diffs, diffs)
+                    best = np.argsort(top_distances)[:k]
+                    top, top_distances = top[best], top_distances[best]
+                else:
+                    top, top_distances = top[:k], top_distances[:k]
+
+                results['ids'].append([self.ids[i] for i in top])
+                results['distances'].append([float(d) for d in top_distances])
+                results['metadatas'].append([self.metadatas[i] for i in top])
+                results['documents'].append([self.documents[i] for i in top])
+
+            return {key: value for key, value in results.items() if key == 'ids' or key in include}
+
+    def _distances(self, queries, positions=None):
+        """Squared L2 distance from every query to every stored row (or only `positions`)."""
+        # ||x - q||^2 = ||x||^2 + ||q||^2 - 2 x.q
+        # int8: x.q = scale * (codes.q), so the scale multiplies the scores instead of every row
+        if positions is not None:
+            scores = queries @ np.asarray(self.embeddings[positions], dtype=np.float32).T
+            if self.scales is not None:
+                scores *= self.scales[positions]
+            sq_norms = self._sq_norms[positions]
+        elif self.dtype == "float32":
+            # Rows past len(self.ids) are unused capacity
+            scores = queries @ self.embeddings[:len(self.ids)].T
+            sq_norms = self._sq_norms[:len(self.ids)]
+        else:
+            n_rows = len(self.ids)
+            scores = np.empty((len(queries), n_rows), dtype=np.float32)
+            for start in range(0, n_rows, SCORE_CHUNK_ROWS):
+                rows = np.asarray(self.embeddings[start:min(start + SCORE_CHUNK_ROWS, n_rows)], dtype=np.float32)
+                scores[:, start:start + len(rows)] = queries @ rows.T
+            if self.scales is not None:
+                scores *= self.scales[:n_rows]
+            sq_norms = self._sq_norms[:n_rows]
+
+        q_sq_norms = np.einsum('ij,ij->i', queries, queries)
+        distances = sq_norms[np.newaxis, :] + q_sq_norms[:, np.newaxis] - 2.0 * scores
+        np.maximum(distances, 0.0, out=distances)
+        return distances
+
+    @staticmethod
+    def _top_k(row, k):
+        """Indices of the k smallest values in row, sorted ascending."""
+        if k < len(row):
+            top = np.argpartition(row, k - 1)[:k]
+        else:
+            top = np.arange(len(row))
+        return top[np.argsort(row[top])]
+
+    # --- Metadata filtering ---
+
+    def _column(self, field):
+        """Returns one metadata field for all rows, cached until the next upsert."""
+        if field not in self._columns:
+            values = [metadata.get(field) for metadata in self.metadatas]
+            if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                column = np.array(values, dtype=np.float64)
+            else:
+                column = np.array(values, dtype=object)
+            self._columns[field] = column
+        return self._columns[field]
+
+    def _where_mask(self, where):
+        """Evaluates a Chroma-style `where` filter to a boolean mask over all rows."""
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self._where_mask(clause)
+            elif key == "$or":
+                any_mask = np.zeros(len(self.ids), dtype=bool)
+                for clause in condition:
+                    any_mask |= self._where_mask(clause)
+                mask &= any_mask
+            else:
+                if not isinstance(condition, dict):
+                    condition = {"$eq": condition}
+                for op, value in condition.items():
+                    mask &= self._field_mask(key, op, value)
+        return mask
+
+    def _field_mask(self, field, op, value):
+        column = self._column(field)
+        if op in ("$in", "$nin"):
+            found = np.array([v in value for v in column], dtype=bool)
+            return found if op == "$in" else ~found
+        if op not in COMPARISONS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        if column.dtype != object:
+            return COMPARISONS[op](column, value)
+
+        # Mixed or missing values: rows that cannot be compared do not match
+        mask = np.zeros(len(column), dtype=bool)
+        for i, v in enumerate(column):
+            if v is None:
+                mask[i] = op == "$ne"
+                continue
+            try:
+                mask[i] = bool(COMPARISONS[op](v, value))
+            except TypeError:
+                pass
+        return mask
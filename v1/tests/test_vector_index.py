@@ -0,0 +1,79 @@
+"""
+Run from the v1 directory:
+    python -m pytest tests
+"""
+import threading
+import numpy as np
+import pytest
+from src import vector_index
+from src.vector_index import NumpyVectorIndex
+
+DIM = 16
+
+def unit_rows(rng, n):
+    rows = rng.standard_normal((n, DIM)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_queries_alongside_upserts_and_compaction(tmp_path, monkeypatch, dtype):
+    # Compact often so the rewrite path runs while queries are in flight
+    monkeypatch.setattr(vector_index, "COMPACT_EVERY", 20)
+    rng = np.random.default_rng(0)
+    index = NumpyVectorIndex(str(tmp_path), dtype=dtype)
+    n_mentors = 200
+    index.upsert(ids=[f"M{i}" for i in range(n_mentors)], embeddings=unit_rows(rng, n_mentors),
+                 metadatas=[{'id': f"M{i}"} for i in range(n_mentors)])
+
+    errors = []
+    done = threading.Event()
+    writes = [0]  # bumped before and after every change; odd while one is in progress
+
+    def writer():
+        writer_rng = np.random.default_rng(1)
+        try:
+            for step in range(300):
+                mentor_id = f"M{writer_rng.integers(n_mentors)}"
+                writes[0] += 1
+                if step % 7 == 0:
+                    index.delete([mentor_id])
+                index.upsert(ids=[mentor_id], embeddings=unit_rows(writer_rng, 1), metadatas=[{'id': mentor_id}])
+                if step % 50 == 0:
+                    index.compact()
+                writes[0] += 1
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    def reader(seed):
+        reader_rng = np.random.default_rng(seed)
+        try:
+            while not done.is_set():
+                query = unit_rows(reader_rng, 1)
+                before = writes[0]
+                result = index.query(query, n_results=5)
+                ids, distances, metadatas = result['ids'][0], result['distances'][0], result['metadatas'][0]
+                assert len(ids) == len(set(ids)) == 5
+                assert [m['id'] for m in metadatas] == ids
+                assert distances == sorted(distances)
+                # Distances must match the vector stored for each returned id
+                # (checked only when no change ran between the query and the get)
+                stored = index.get(ids=ids, include=('embeddings',))
+                if before % 2 or writes[0] != before:
+                    continue
+                for mentor_id, distance, vector in zip(stored['ids'], distances, stored['embeddings']):
+                    diff = vector - query[0]
+                    assert distance == pytest.approx(float(diff @ diff), abs=0.05)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader, args=(s,)) for s in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, errors
+    assert index.count() == len(set(index.get()['ids']))
+    reloaded = NumpyVectorIndex(str(tmp_path), dtype=dtype)
+    assert sorted(reloaded.get()['ids']) == sorted(index.get()['ids'])
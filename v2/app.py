@@ -1,7 +1,7 @@
 import functools
 import uuid
 from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, session, abort, flash # Added 'flash'
+from flask import Flask, render_template, request, redirect, url_for, session, abort, flash, Response, stream_with_context # Added 'flash'
 import os
 import json
 import pandas as pd
@@ -30,6 +30,9 @@ except ImportError:
         def suggest_resources(self, query):
             # Simulate a failure for demonstration if needed, otherwise give response
             return "<p>[AI RESPONSE - SIMULATED]</p><p>Disclaimer: This advice is for guidance only.</p>"
+        def stream_resources(self, query):
+            yield "<p>[AI RESPONSE - SIMULATED]</p>"
+            yield "<p>Disclaimer: This advice is for guidance only.</p>"
         def generate_session_tips(self, student_data, mentor_assessment):
             # Updated to reflect new formatted output
             return "<p class='font-bold text-lg text-mentor-green'>AI-Generated Session Plan:</p><ul class='list-disc list-inside space-y-2'><li>Probing Question: How do you feel about Complex Algebra?</li><li>Action Step: Review all formulas.</li><li>Next Session Focus: Applied Physics.</li></ul>"
@@ -389,6 +392,33 @@ def student_query():
 
     return redirect(url_for('student_portal'))
 
+def sse_events(chunks):
+    """Formats text chunks as server-sent events, ending with a 'done' (or 'error') event."""
+    try:
+        for chunk in chunks:
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    except Exception as e:
+        print(f"Advisor stream failed: {e}")
+        yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+
+@app.route('/student/query/stream')
+@role_required('Student')
+def student_query_stream():
+    """Streams the advisor response over server-sent events while it is generated."""
+    query = request.args.get('query', '')
+
+    if not query or len(query.strip()) < 5:
+        return Response("Please enter a longer query to get a helpful AI response.", status=400)
+
+    DATA_SERVICE.data['students'][session.get('user_id', 'std_001')]['last_query'] = query
+
+    return Response(
+        stream_with_context(sse_events(ADVISOR.stream_resources(query))),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/student/submit-feedback', methods=['POST'])
 @role_required('Student')
 def submit_student_feedback():
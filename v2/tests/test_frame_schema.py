@@ -0,0 +1,38 @@
+"""
+Run from this app's directory:
+    python -m pytest tests
+"""
+import json
+import numpy as np
+import pandas as pd
+from src import frame_schema
+from src.data_service import DataService
+
+def test_numeric_column_is_downcast():
+    converted = frame_schema.optimize(pd.DataFrame({'math_marks': ['90', '85', '77']}), frame_schema.STUDENT_SCHEMA)
+    assert converted['math_marks'].dtype == np.int8
+    assert converted['math_marks'].tolist() == [90, 85, 77]
+
+def test_mixed_column_keeps_its_values():
+    df = pd.DataFrame({'math_marks': ['90', 'absent', 85, None], 'date': ['2024-01-05', 'soon', None, '2024-02-01']})
+    converted = frame_schema.optimize(df, {**frame_schema.STUDENT_SCHEMA, **frame_schema.FEEDBACK_SCHEMA})
+    assert converted['math_marks'].equals(df['math_marks'])
+    assert converted['date'].equals(df['date'])
+
+def test_mixed_column_survives_save_and_reload(tmp_path):
+    students = [
+        {'student_id': 'std_001', 'name': 'A', 'math_marks': 90},
+        {'student_id': 'std_002', 'name': 'B', 'math_marks': 'absent'},
+    ]
+    (tmp_path / 'students.json').write_text(json.dumps(students))
+    (tmp_path / 'mentors.json').write_text('[]')
+
+    service = DataService(str(tmp_path), use_snapshot=False)
+    updated = service.students_df.copy()
+    updated.loc[updated['student_id'] == 'std_001', 'name'] = 'A2'
+    service.update_student_data(updated)
+
+    reloaded = DataService(str(tmp_path), use_snapshot=False)
+    marks = dict(zip(reloaded.students_df['student_id'].tolist(), reloaded.students_df['math_marks'].tolist()))
+    assert marks == {'std_001': 90, 'std_002': 'absent'}
+    assert reloaded.get_student_by_id('std_001')['name'] == 'A2'
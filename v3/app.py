@@ -1,7 +1,7 @@
 import functools
 import uuid
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, redirect, url_for, session, abort, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, abort, flash, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from flask_jwt_extended import (
     JWTManager, create_access_token,
@@ -35,6 +35,9 @@ except ImportError:
             print("LLM Advisor Initialized (Simulated)")
         def suggest_resources(self, query):
             return "<p>[AI RESPONSE - SIMULATED]</p><p>Disclaimer: This advice is for guidance only.</p>"
+        def stream_resources(self, query):
+            yield "<p>[AI RESPONSE - SIMULATED]</p>"
+            yield "<p>Disclaimer: This advice is for guidance only.</p>"
         def generate_session_tips(self, student_data, mentor_assessment):
             return "<p><b>AI-Generated Session Plan:</b></p><ul><li>Review Algebra</li><li>Practice Physics</li></ul>"
         def analyze_career_path(self, assessment_data):
@@ -213,6 +216,29 @@ def student_query():
     flash("AI response generated.", "info")
     return redirect(url_for("student_portal"))
 
+def sse_events(chunks):
+    """Formats text chunks as server-sent events, ending with a 'done' (or 'error') event."""
+    try:
+        for chunk in chunks:
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    except Exception as e:
+        print(f"Advisor stream failed: {e}")
+        yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+
+@app.route("/student/query/stream")
+@role_required("Student")
+def student_query_stream():
+    q = request.args.get("query", "").strip()
+    # Same check as the v2/v4 stream routes: blank or very short queries never reach Gemini
+    if len(q) < 5:
+        return Response("Please enter a longer query to get a helpful AI response.", status=400)
+    return Response(
+        stream_with_context(sse_events(ADVISOR.stream_resources(q))),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ==========================================================
 # MAIN
 # ==========================================================
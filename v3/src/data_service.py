@@ -2,13 +2,22 @@ import pandas as pd
 import json
 import os
 import io
+from src.student_store import StudentStore
+from src import snapshot, frame_schema
 
 class DataService:
-    def __init__(self, data_dir='src/data'):
+    def __init__(self, data_dir='src/data', use_snapshot=snapshot.USE_SNAPSHOT,
+                 optimize_dtypes=frame_schema.OPTIMIZE_DTYPES):
         self.data_dir = data_dir
+        # Compact dtypes (see src/frame_schema.py), applied on load and after every update
+        self.optimize_dtypes = optimize_dtypes
+        # Columnar snapshot (see src/snapshot.py) is preferred over parsing JSON/CSV when current
+        self.use_snapshot = use_snapshot
         self.students_file = os.path.join(data_dir, 'students.json')
         self.mentors_file = os.path.join(data_dir, 'mentors.json')
         self.feedback_file = os.path.join(data_dir, 'feedback_data.csv')
+        # Row-level changes go to an append-only log next to students.json
+        self.student_store = StudentStore(self.students_file, os.path.join(data_dir, 'students.log.jsonl'))
         self.students_df = self._load_students()
         self.mentors_df = self._load_mentors()
         self.feedback_df = self._load_feedback()
@@ -21,20 +30,48 @@ class DataService:
         if 'is_verified' not in self.students_df.columns:
             self.students_df['is_verified'] = False
 
-        # Ensure is_verified is boolean type
-        self.students_df['is_verified'] = self.students_df['is_verified'].astype(bool)
+        # Ensure is_verified is boolean type (rows added from the change log may lack it)
+        self.students_df['is_verified'] = self.students_df['is_verified'].fillna(False).astype(bool)
+        self.students_df = self._optimize(self.students_df, frame_schema.STUDENT_SCHEMA)
+        self.feedback_df = self._optimize(self.feedback_df, frame_schema.FEEDBACK_SCHEMA)
 
+        self._reindex_students()
         self.users = self._load_users()
 
+    def _optimize(self, df, schema):
+        return frame_schema.optimize(df, schema) if self.optimize_dtypes else df
+
+    def memory_report(self):
+        """Deep memory usage per frame and column."""
+        return frame_schema.memory_report({
+            'students': self.students_df,
+            'mentors': self.mentors_df,
+            'feedback': self.feedback_df
+        })
+
+    def _load_snapshot(self, name, source_path):
+        if not self.use_snapshot:
+            return None
+        return snapshot.load_table(self.data_dir, name, source_path)
+
+    def _refresh_snapshot(self, name, df, source_path):
+        """Rewrites a snapshot table after its source file was rewritten, if snapshots are in use."""
+        if self.use_snapshot and snapshot.has_snapshot(self.data_dir):
+            try:
+                snapshot.write_table(self.data_dir, name, df, source_path)
+            except Exception as e:
+                print(f"Could not refresh {name} snapshot: {e}")
+
     def _load_students(self):
-        try:
-            with open(self.students_file, 'r') as f:
-                data = json.load(f)
-            return pd.DataFrame(data)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return pd.DataFrame()
+        df = self._load_snapshot('students', self.students_file)
+        if df is not None:
+            return self.student_store.apply_log(df)
+        return self.student_store.load()
 
     def _load_mentors(self):
+        df = self._load_snapshot('mentors', self.mentors_file)
+        if df is not None:
+            return df
         try:
             with open(self.mentors_file, 'r') as f:
                 data = json.load(f)
@@ -49,6 +86,9 @@ class DataService:
             return pd.DataFrame(data)
 
     def _load_feedback(self):
+        df = self._load_snapshot('feedback', self.feedback_file)
+        if df is not None:
+            return df
         try:
             return pd.read_csv(self.feedback_file)
         except FileNotFoundError:
@@ -60,54 +100,132 @@ class DataService:
             'admin': {'password': 'admin_pass', 'role': 'admin', 'id': 'adm_001'}
         }
 
-        # Load mentors
-        for _, row in self.mentors_df.iterrows():
-            users[row['email']] = {
-                'password': row['password'],
-                'role': 'mentor',
-                'id': row['mentor_id']
-            }
-
-        # Load students
-        for _, row in self.students_df.iterrows():
-            users[row['student_id']] = {
-                'password': row['student_id'] + '_pass', # Mock password based on ID
-                'role': 'student',
-                'id': row['student_id']
-            }
+        # Load mentors (column-wise, no per-row Series). An empty JSON list
+        # gives a frame without columns, so check before indexing them.
+        mentors = self.mentors_df
+        if not mentors.empty and {'email', 'password', 'mentor_id'} <= set(mentors.columns):
+            users.update(
+                (email, {'password': password, 'role': 'mentor', 'id': mentor_id})
+                for email, password, mentor_id in zip(
+                    mentors['email'].tolist(), mentors['password'].tolist(), mentors['mentor_id'].tolist()
+                )
+            )
+
+        # Load students (tolist: iterating Arrow-backed string columns element-wise is slow)
+        students = self.students_df
+        if not students.empty and 'student_id' in students.columns:
+            users.update((student_id, self._student_user(student_id)) for student_id in students['student_id'].tolist())
         return users
 
+    def _student_user(self, student_id):
+        return {
+            'password': student_id + '_pass', # Mock password based on ID
+            'role': 'student',
+            'id': student_id
+        }
+
+    def _sync_student_users(self, old_ids, new_ids):
+        """Applies only the student logins that were added or removed by an update (ids are set-like)."""
+        for student_id in old_ids - new_ids:
+            if self.users.get(student_id, {}).get('role') == 'student':
+                del self.users[student_id]
+        for student_id in new_ids - old_ids:
+            self.users[student_id] = self._student_user(student_id)
+        return len(old_ids ^ new_ids)
+
     def get_user(self, username):
         return self.users.get(username)
 
     def get_all_students(self):
         return self.students_df.to_dict('records')
 
+    def _reindex_students(self):
+        """Rebuilds the student_id -> row position map (first row wins for duplicate IDs)."""
+        ids = self.students_df['student_id'].tolist()
+        self._student_positions = dict(zip(reversed(ids), range(len(ids) - 1, -1, -1)))
+
     def get_student_by_id(self, student_id):
-        student_data = self.students_df[self.students_df['student_id'] == student_id]
-        if not student_data.empty:
-            return student_data.iloc[0].to_dict()
+        # O(1) lookup via the position map instead of a boolean scan over all students
+        position = self._student_positions.get(student_id)
+        if position is not None:
+            return self.students_df.iloc[position].to_dict()
         return None
 
     def update_student_data(self, updated_df):
+        old_df = self.students_df
+        old_ids = self._student_positions.keys()  # view of the map that _reindex_students replaces
+
         # Ensure 'is_verified' is carried over if not present in the new data
         if 'is_verified' not in updated_df.columns and 'is_verified' in self.students_df.columns:
              updated_df = pd.merge(updated_df, self.students_df[['student_id', 'is_verified']], on='student_id', how='left')
 
         self.students_df = updated_df
         self.students_df['is_verified'] = self.students_df['is_verified'].fillna(False).astype(bool)
-        # Save the updated DataFrame back to students.json
-        self._save_students()
-        # Reload users to update any potentially changed student info
-        self.users = self._load_users()
+        self.students_df = self._optimize(self.students_df, frame_schema.STUDENT_SCHEMA)
+        self._reindex_students()
+        # Persist only the rows that changed
+        self._save_student_changes(old_df)
+        # Student logins only depend on student_id: update just the added/removed ones
+        self._sync_student_users(old_ids, self._student_positions.keys())
 
     def _save_students(self):
-        # Save DataFrame to JSON file with the 'is_verified' flag
-        self.students_df.to_json(self.students_file, orient='records', indent=4)
+        # Full rewrite of students.json (atomic rename); also clears the change log
+        self.student_store.compact(self.students_df)
+        self._refresh_snapshot('students', self.students_df, self.students_file)
+
+    def _save_student_changes(self, old_df, student_ids=None):
+        """
+        Appends the changed rows to the student change log.
+
+        With student_ids the caller names the changed rows; otherwise they are
+        found by comparing students_df with old_df. Column changes and
+        duplicate IDs fall back to a full rewrite, as does a long log.
+        """
+        new_df = self.students_df
+        if student_ids is not None:
+            changed = new_df[new_df['student_id'].isin(student_ids)]
+            self.student_store.append(changed)
+        elif set(new_df.columns) != set(old_df.columns) or not new_df['student_id'].is_unique \
+                or not old_df['student_id'].is_unique:
+            return self._save_students()
+        elif new_df['student_id'].reset_index(drop=True).equals(old_df['student_id'].reset_index(drop=True)):
+            # Same students in the same order (e.g. a marks upload): compare row by row
+            before = old_df.reset_index(drop=True)
+            after = new_df.reset_index(drop=True)[before.columns]
+            self.student_store.append(new_df[self._modified_rows(before, after)])
+        else:
+            old_rows = old_df.set_index('student_id')
+            new_rows = new_df.set_index('student_id')[old_rows.columns]
+            common = new_rows.index.intersection(old_rows.index)
+            before, after = old_rows.loc[common], new_rows.loc[common]
+            changed_ids = common[self._modified_rows(before, after)].union(new_rows.index.difference(old_rows.index))
+            self.student_store.append(
+                new_df[new_df['student_id'].isin(changed_ids)],
+                old_rows.index.difference(new_rows.index).tolist()
+            )
+
+        if self.student_store.needs_compaction():
+            self._save_students()
+
+    @staticmethod
+    def _modified_rows(before, after):
+        """Boolean mask of rows that differ between two aligned frames (missing == missing)."""
+        # Categoricals with different category sets cannot be compared directly
+        categorical = [c for c in before.columns
+                       if isinstance(before[c].dtype, pd.CategoricalDtype) or isinstance(after[c].dtype, pd.CategoricalDtype)]
+        if categorical:
+            before = before.astype({c: object for c in categorical})
+            after = after.astype({c: object for c in categorical})
+        # Nullable dtypes compare to <NA> against a missing value: count that as a change
+        differs = (before != after).fillna(True).astype(bool)
+        both_missing = (before.isna() & after.isna()).to_numpy()
+        return (differs.to_numpy() & ~both_missing).any(axis=1)
 
     def update_feedback(self, new_feedback):
         self.feedback_df = pd.concat([self.feedback_df, pd.DataFrame([new_feedback])], ignore_index=True)
+        self.feedback_df = self._optimize(self.feedback_df, frame_schema.FEEDBACK_SCHEMA)
         self.feedback_df.to_csv(self.feedback_file, index=False)
+        self._refresh_snapshot('feedback', self.feedback_df, self.feedback_file)
 
     def get_feedback(self):
         return self.feedback_df
@@ -128,7 +246,8 @@ class DataService:
         """Sets the is_verified flag for a student to True."""
         try:
             self.students_df.loc[self.students_df['student_id'] == student_id, 'is_verified'] = True
-            self._save_students()
+            # One log line instead of rewriting students.json
+            self._save_student_changes(None, [student_id])
             print(f"Report for {student_id} verified successfully.")
             return True
         except Exception as e:
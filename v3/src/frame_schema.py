@@ -0,0 +1,114 @@
+"""
+Memory-lean dtypes for the DataService frames, driven by a per-column schema.
+
+Print a memory report for a data directory (default dtypes vs optimized):
+    python -m src.frame_schema [data_dir]
+"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+OPTIMIZE_DTYPES = os.environ.get("DATA_OPTIMIZE_DTYPES", "1") == "1"
+# Repeated values (IDs, subjects) become categoricals only below this distinct/rows ratio;
+# a categorical of unique IDs would be larger than the plain strings
+MAX_CATEGORY_RATIO = 0.5
+
+# Column -> kind. Columns not listed keep their dtype.
+STUDENT_SCHEMA = {
+    'student_id': 'category',
+    'subject': 'category',
+    'math_marks': 'number',
+    'science_marks': 'number',
+    'english_marks': 'number',
+    'psychometric_score': 'number',
+    'is_verified': 'flag',
+}
+FEEDBACK_SCHEMA = {
+    'session_id': 'category',
+    'student_id': 'category',
+    'mentor_id': 'category',
+    'subject': 'category',
+    'date': 'datetime',
+    'score': 'number',
+}
+
+_INTEGER_TYPES = [np.int8, np.int16, np.int32, np.int64]
+
+def _as_number(series):
+    """
+    Smallest NumPy integer type that holds whole-number values; float32 when
+    some are missing (NaN rather than pd.NA, so records handed to templates
+    and json.dumps look as before). Fractional values stay float64: float32
+    would print 8.9 as 8.899999618530273. A column with any value that does
+    not parse as a number is returned unchanged, so saving it back to disk
+    cannot turn that value into NaN.
+    """
+    numbers = pd.to_numeric(series, errors='coerce')
+    if numbers.notna().sum() < series.notna().sum():
+        return series
+    values = numbers.dropna()
+    if not (values == np.round(values)).all():
+        return numbers.astype('float64')
+    if len(values) < len(numbers):
+        return numbers.astype('float32')
+    low, high = (values.min(), values.max()) if len(values) else (0, 0)
+    for np_type in _INTEGER_TYPES:
+        info = np.iinfo(np_type)
+        if info.min <= low and high <= info.max:
+            return numbers.astype(np_type)
+    return numbers
+
+def _convert(series, kind):
+    if kind == 'category':
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.cat.remove_unused_categories()
+        if len(series) and series.nunique(dropna=True) / len(series) < MAX_CATEGORY_RATIO:
+            return series.astype('category')
+        return series
+    if kind == 'number':
+        return _as_number(series)
+    if kind == 'flag':
+        # Nullable boolean only when something is actually missing; plain bool is half the size
+        return series.astype('boolean') if series.isna().any() else series.astype(bool)
+    if kind == 'datetime':
+        # Same rule as numbers: only convert when every present value parses
+        dates = pd.to_datetime(series, errors='coerce')
+        return dates if dates.notna().sum() == series.notna().sum() else series
+    raise ValueError(f"Unknown column kind: {kind}")
+
+def optimize(df, schema):
+    """Returns df with the schema's columns converted; a column with unparsable values keeps its dtype."""
+    converted = {
+        column: _convert(df[column], kind)
+        for column, kind in schema.items()
+        if column in df.columns
+    }
+    return df.assign(**converted) if converted else df
+
+def memory_report(frames):
+    """{name: {'rows', 'bytes', 'columns': {column: {'dtype', 'bytes'}}}} with deep memory usage."""
+    report = {}
+    for name, df in frames.items():
+        usage = df.memory_usage(deep=True, index=False)
+        report[name] = {
+            'rows': len(df),
+            'bytes': int(usage.sum()),
+            'columns': {column: {'dtype': str(df[column].dtype), 'bytes': int(usage[column])} for column in df.columns}
+        }
+    return report
+
+def main(data_dir='src/data'):
+    from src.data_service import DataService
+
+    before = DataService(data_dir, optimize_dtypes=False).memory_report()
+    after = DataService(data_dir, optimize_dtypes=True).memory_report()
+    for name in before:
+        print(f"{name}: {before[name]['rows']} rows, {before[name]['bytes'] / 1e6:.2f} MB -> {after[name]['bytes'] / 1e6:.2f} MB")
+        for column, info in after[name]['columns'].items():
+            old = before[name]['columns'][column]
+            print(f"  {column:<20} {old['dtype']:>10} {old['bytes'] / 1e6:8.2f} MB -> {info['dtype']:>14} {info['bytes'] / 1e6:8.2f} MB")
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'src/data')
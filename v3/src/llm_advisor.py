@@ -17,21 +17,22 @@ class LLMAdvisor:
             print(f"Error initializing Gemini client: {e}. Check API key and dependencies.")
             self.client = None
 
+    def _config(self, tools=None):
+        return types.GenerateContentConfig(
+            system_instruction="You are a professional educational and legal compliance AI advisor. All advice must be accurate, respectful, and include a clear disclaimer that it is not a substitute for official school policy.",
+            tools=tools,
+        )
+
     def _call_gemini_with_safety(self, prompt, tools=None):
         """Standardized function for making API calls with safety and error handling."""
         if not self.client:
             return "<p class='text-red-500'>[AI OFFLINE] LLM Service is not available. Please check the GEMINI_API_KEY.</p>"
 
-        config = types.GenerateContentConfig(
-            system_instruction="You are a professional educational and legal compliance AI advisor. All advice must be accurate, respectful, and include a clear disclaimer that it is not a substitute for official school policy.",
-            tools=tools,
-        )
-
         try:
             response = self.client.models.generate_content(
                 model=self.model,
                 contents=[prompt],
-                config=config
+                config=self._config(tools)
             )
             return response.text
         except APIError as e:
@@ -41,17 +42,46 @@ class LLMAdvisor:
             print(f"General AI Error: {e}")
             return f"<p class='text-red-500'>[NETWORK ERROR] Could not connect to the AI service. (Details: {str(e)})</p>"
 
+    def _stream_gemini_with_safety(self, prompt, tools=None):
+        """Streaming variant of _call_gemini_with_safety: yields text chunks as Gemini produces them."""
+        if not self.client:
+            yield "<p class='text-red-500'>[AI OFFLINE] LLM Service is not available. Please check the GEMINI_API_KEY.</p>"
+            return
 
-    def suggest_resources(self, query):
-        """Generates legally compliant, accurate advice, using Google Search grounding."""
-        prompt = (
+        try:
+            for chunk in self.client.models.generate_content_stream(
+                model=self.model,
+                contents=[prompt],
+                config=self._config(tools)
+            ):
+                if chunk.text:
+                    yield chunk.text
+        except APIError as e:
+            print(f"Gemini API Error: {e}")
+            yield f"<p class='text-red-500'>[API ERROR] The AI service failed to generate a response (Code: {e.status_code}). Please try again later.</p>"
+        except Exception as e:
+            print(f"General AI Error: {e}")
+            yield f"<p class='text-red-500'>[NETWORK ERROR] Could not connect to the AI service. (Details: {str(e)})</p>"
+
+
+    def _resources_prompt(self, query):
+        return (
             f"As an educational consultant, analyze the following student query and provide a structured, helpful response. "
             f"Query: {query}"
         )
+
+    def suggest_resources(self, query):
+        """Generates legally compliant, accurate advice, using Google Search grounding."""
         tools = [{"google_search": {}}]
-        response_text = self._call_gemini_with_safety(prompt, tools=tools)
+        response_text = self._call_gemini_with_safety(self._resources_prompt(query), tools=tools)
         return response_text.replace('\n', '<br>')
 
+    def stream_resources(self, query):
+        """Same advice as suggest_resources, yielded chunk by chunk while Gemini generates it."""
+        tools = [{"google_search": {}}]
+        for chunk in self._stream_gemini_with_safety(self._resources_prompt(query), tools=tools):
+            yield chunk.replace('\n', '<br>')
+
     def generate_session_tips(self, student_data, mentor_assessment):
         """Analyzes mentor input and student data to generate actionable session tips."""
         # ... (Keep the existing prompt preparation logic here) ...
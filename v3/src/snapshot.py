@@ -0,0 +1,125 @@
+"""
+Columnar snapshot of the data directory (Arrow IPC files, memory-mapped on load).
+
+Convert the JSON/CSV sources once, from the app directory:
+    python -m src.snapshot [data_dir]
+
+DataService then loads each table from <data_dir>/snapshot/<name>.arrow when
+the manifest says it was written from the current version of its source file,
+and falls back to parsing the JSON/CSV otherwise.
+"""
+import json
+import os
+import sys
+
+# --- Configuration ---
+USE_SNAPSHOT = os.environ.get("DATA_SNAPSHOT", "1") == "1"
+SNAPSHOT_DIRNAME = 'snapshot'
+MANIFEST_FILE = 'manifest.json'
+SNAPSHOT_FORMAT_VERSION = 1
+
+def source_signature(path):
+    """(mtime_ns, size) of a source file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _read_manifest(snapshot_dir):
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST_FILE), 'r') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        return None
+    return manifest
+
+def _atomic_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def write_table(data_dir, name, df, source_path):
+    """Writes one table as an uncompressed Arrow IPC file and records it in the manifest."""
+    import pyarrow as pa
+
+    snapshot_dir = os.path.join(data_dir, SNAPSHOT_DIRNAME)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = os.path.join(snapshot_dir, f'{name}.arrow')
+    tmp_path = path + '.tmp'
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    manifest = _read_manifest(snapshot_dir) or {'format_version': SNAPSHOT_FORMAT_VERSION, 'tables': {}}
+    manifest['tables'][name] = {
+        'file': f'{name}.arrow',
+        'source': os.path.basename(source_path),
+        'source_signature': source_signature(source_path),
+        'rows': len(df)
+    }
+    _atomic_json(os.path.join(snapshot_dir, MANIFEST_FILE), manifest)
+
+def has_snapshot(data_dir):
+    return _read_manifest(os.path.join(data_dir, SNAPSHOT_DIRNAME)) is not None
+
+def load_table(data_dir, name, source_path):
+    """
+    Returns the snapshot table as a DataFrame, or None when there is no
+    snapshot, it is stale (source file changed since) or pyarrow is missing.
+    """
+    snapshot_dir = os.path.join(data_dir, SNAPSHOT_DIRNAME)
+    manifest = _read_manifest(snapshot_dir)
+    entry = (manifest or {}).get('tables', {}).get(name)
+    if entry is None:
+        return None
+    if entry['source_signature'] != source_signature(source_path):
+        print(f"Snapshot of {name} is older than {source_path}; parsing the source instead.")
+        return None
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    try:
+        # Memory-mapped read: column buffers are not copied into Python objects until needed
+        with pa.memory_map(os.path.join(snapshot_dir, entry['file']), 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.to_pandas()
+    except (OSError, pa.ArrowInvalid) as e:
+        print(f"Could not read snapshot of {name}: {e}")
+        return None
+
+def convert(data_dir='src/data'):
+    """Builds the snapshot from the current JSON/CSV files (students include the change log)."""
+    from src.data_service import DataService
+
+    service = DataService(data_dir, use_snapshot=False)
+    sources = [
+        ('students', service.students_df, service.students_file),
+        ('mentors', service.mentors_df, service.mentors_file),
+        ('feedback', service.feedback_df, service.feedback_file),
+    ]
+    for name, df, source_path in sources:
+        if source_signature(source_path) is None:
+            print(f"Skipping {name}: {source_path} does not exist.")
+            continue
+        if name == 'students':
+            # The snapshot stands in for students.json, so fold the change log in first
+            service._save_students()
+        try:
+            write_table(data_dir, name, df, source_path)
+            print(f"Wrote {name} snapshot ({len(df)} rows).")
+        except Exception as e:
+            print(f"Could not snapshot {name}: {e}")
+
+if __name__ == '__main__':
+    convert(sys.argv[1] if len(sys.argv) > 1 else 'src/data')
@@ -0,0 +1,136 @@
+import json
+import os
+import pandas as pd
+
+# Change-log records kept before they are folded back into the JSON snapshot
+COMPACT_EVERY = 1000
+
+class StudentStore:
+    """
+    Durable student storage: a JSON snapshot plus an append-only change log.
+
+    Single-row changes (e.g. verifying one report) append one fsync'ed line
+    to the log instead of rewriting the whole snapshot. Loading replays the
+    log over the snapshot. Once the log holds COMPACT_EVERY records it is
+    folded into a new snapshot written to a temp file and renamed into place,
+    then the log is reset the same way. Replaying a log twice is harmless
+    (upserts and deletes are idempotent), so a crash between the two renames
+    loses nothing.
+    """
+    def __init__(self, snapshot_file, log_file):
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file
+        self.log_records = 0
+
+    def load(self):
+        """Returns the current students as a DataFrame (snapshot + replayed log)."""
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                records = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            records = []
+        return self.apply_log(pd.DataFrame(records))
+
+    def apply_log(self, students_df):
+        """Replays the change log over students_df (loaded from any snapshot format)."""
+        upserts, deleted = self._read_log()
+        if not upserts and not deleted:
+            return students_df
+        if 'student_id' not in students_df.columns:
+            students_df = pd.DataFrame(columns=['student_id'])
+        students_df = students_df.reset_index(drop=True)
+
+        if upserts:
+            rows = pd.DataFrame(list(upserts.values()))
+            # All-null columns come back as None objects; make them NaN floats
+            rows = rows.astype({c: 'float64' for c in rows.columns if rows[c].isna().all()})
+            ids = students_df['student_id'].tolist()
+            positions = dict(zip(reversed(ids), range(len(ids) - 1, -1, -1)))
+            targets = rows['student_id'].map(positions)
+            existing = targets.notna().to_numpy()
+
+            # Changed students are updated in place so row order is kept
+            if existing.any():
+                labels = targets[existing].astype(int).to_numpy()
+                for column in rows.columns:
+                    values = rows.loc[existing, column].to_numpy()
+                    try:
+                        students_df.loc[labels, column] = values
+                    except (TypeError, ValueError):
+                        # e.g. nulls logged for a float column: widen, assign, re-infer
+                        students_df[column] = students_df[column].astype(object)
+                        students_df.loc[labels, column] = values
+                        students_df[column] = students_df[column].infer_objects()
+            if (~existing).any():
+                students_df = pd.concat([students_df, rows[~existing]], ignore_index=True)
+
+        if deleted:
+            students_df = students_df[~students_df['student_id'].isin(deleted)].reset_index(drop=True)
+        return students_df
+
+    def _read_log(self):
+        """Returns ({student_id: latest row}, deleted ids) from the change log."""
+        upserts, deleted = {}, set()
+        self.log_records = 0
+        if not os.path.exists(self.log_file):
+            return upserts, deleted
+
+        valid_bytes = 0
+        with open(self.log_file, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("incomplete line")
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-append: cut it so new appends start clean
+                    print(f"Truncating torn record at byte {valid_bytes} of {self.log_file}.")
+                    f.close()
+                    os.truncate(self.log_file, valid_bytes)
+                    break
+                valid_bytes += len(line)
+                self.log_records += 1
+                if entry['op'] == 'delete':
+                    upserts.pop(entry['student_id'], None)
+                    deleted.add(entry['student_id'])
+                else:
+                    deleted.discard(entry['row']['student_id'])
+                    upserts[entry['row']['student_id']] = entry['row']
+        return upserts, deleted
+
+    def append(self, changed_df, deleted_ids=()):
+        """Logs upserts for the rows in changed_df and deletes for deleted_ids."""
+        lines = []
+        if len(changed_df):
+            # to_json handles NumPy scalars and NaN -> null like the snapshot writer
+            for row_json in changed_df.to_json(orient='records', lines=True).splitlines():
+                lines.append(f'{{"op": "upsert", "row": {row_json}}}\n')
+        for student_id in deleted_ids:
+            lines.append(json.dumps({'op': 'delete', 'student_id': student_id}) + '\n')
+        if not lines:
+            return 0
+
+        with open(self.log_file, 'a') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self.log_records += len(lines)
+        return len(lines)
+
+    def needs_compaction(self):
+        return self.log_records >= COMPACT_EVERY
+
+    def compact(self, students_df):
+        """Writes students_df as the new snapshot (atomic rename) and resets the log."""
+        self._atomic_write(self.snapshot_file, students_df.to_json(orient='records', indent=4))
+        if os.path.exists(self.log_file):
+            self._atomic_write(self.log_file, '')
+        self.log_records = 0
+
+    def _atomic_write(self, path, text):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
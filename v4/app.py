@@ -1,9 +1,10 @@
 import functools
 import uuid
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, redirect, url_for, session, abort, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, abort, flash, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
+import json
 import pandas as pd
 from io import StringIO
 # --- (AIMatcher, RankingEngine, LLMAdvisor, DataService remain unchanged) ---
@@ -24,6 +25,9 @@ class LLMAdvisor:
     def __init__(self): pass
     def suggest_resources(self, query):
         return "<p>[SIMULATED ADVICE] Read chapters 1-3 and practice problems.</p>"
+    def stream_resources(self, query):
+        yield "<p>[SIMULATED ADVICE] "
+        yield "Read chapters 1-3 and practice problems.</p>"
     def generate_session_tips(self, student_data, mentor_assessment):
         return "<p>Session tips: focus on core concepts and exercises.</p>"
     def analyze_career_path(self, assessment_data):
@@ -268,6 +272,29 @@ def student_query():
     DATA_SERVICE.data['students'][session.get('user_id','std_001')]['last_query']=q
     return redirect(url_for('student_dashboard')) # Updated redirect
 
+def sse_events(chunks):
+    """Formats text chunks as server-sent events, ending with a 'done' (or 'error') event."""
+    try:
+        for chunk in chunks:
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    except Exception as e:
+        print(f"Advisor stream failed: {e}")
+        yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+
+@app.route('/student/query/stream')
+@role_required('Student')
+def student_query_stream():
+    q = request.args.get('query','').strip()
+    if not q or len(q)<5:
+        return Response('Please enter a longer query', status=400)
+    DATA_SERVICE.data['students'][session.get('user_id','std_001')]['last_query']=q
+    return Response(
+        stream_with_context(sse_events(ADVISOR.stream_resources(q))),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/student/submit-feedback', methods=['POST'])
 @role_required('Student')
 def student_feedback():